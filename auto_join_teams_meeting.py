@@ -6,15 +6,25 @@ import ctypes
 import comtypes
 import comtypes.client
 import datetime
+import json
+import math
+import multiprocessing
+import os
+import queue
+import random
 import re
 import sys
-import time
+import threading
 import warnings
 import webbrowser
-from concurrent.futures import ThreadPoolExecutor
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from dataclasses import dataclass
-from typing import Optional, List, Tuple, Generator, Any, Callable
+from typing import Optional, List, Tuple, Generator, Any, Callable, Dict
 
+import pythoncom
 import pywintypes
 import win32api
 import win32com.client
@@ -22,6 +32,15 @@ import win32con
 import win32gui
 import win32process
 
+import ics_calendar
+from clocks import SystemClock
+from meeting_index import MeetingIndex, meeting_identifiers
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 
 def _for_debugging_purpose(ensure_dispatch):
     """If Dispatch object Outlook.Application is cached then delete the file. This may happen when
@@ -32,24 +51,197 @@ def _for_debugging_purpose(ensure_dispatch):
     print(sys.modules[ensure_dispatch.__module__].__file__)
 
 
-def retry(times: int):
-    """Specific retry wrapper for iui_auto.region_control_siblings_from_document_control. Since sometimes join button
-    is not parsed and length of parsed list of Control_5033 objects is less than 2.
+class Metrics:
+    """Thread safe in-process counters and latency observations"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = dict()
+        self.latencies = dict()
+
+    def increment(self, name: str, value: int = 1):
+        """Increment counter"""
+
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float):
+        """Record latency observation in seconds"""
+
+        with self._lock:
+            self.latencies.setdefault(name, list()).append(seconds)
+
+    def snapshot(self) -> dict:
+        """Counters and latency summary (count, total, max) for reporting"""
+
+        with self._lock:
+            summary = {name: (len(values), sum(values), max(values)) for name, values in self.latencies.items()}
+            return {"counters": dict(self.counters), "latencies": summary}
+
+    def export(self) -> dict:
+        """Raw counters and latency observations, picklable. Counterpart of `merge`"""
+
+        with self._lock:
+            return {"counters": dict(self.counters),
+                    "latencies": {name: list(values) for name, values in self.latencies.items()}}
+
+    def merge(self, exported: dict):
+        """Add counters and latency observations exported by another process (e.g. join worker)"""
+
+        with self._lock:
+            for name, value in exported.get("counters", dict()).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+            for name, values in exported.get("latencies", dict()).items():
+                self.latencies.setdefault(name, list()).extend(values)
+
+
+metrics = Metrics()
+# All timing logic reads time through this clock. Simulations install clocks.VirtualClock
+clock = SystemClock()
+
+
+def install_clock(new_clock: SystemClock) -> SystemClock:
+    """Route timing logic through `new_clock`. Returns previously installed clock"""
+
+    global clock
+    previous, clock = clock, new_clock
+    return previous
+
+
+@dataclass()
+class RetryPolicy:
+    """Retry with exponential backoff and jitter, bounded by attempts, own `budget` and caller deadline.
+
+    Deadline is an absolute `clock.time()` timestamp. It is either passed to `run` or taken from the enclosing
+    `RetryPolicy.deadline_scope`, so every retried stage of one join gives up at the same moment (meeting start).
+    Each attempt emits `retry.<name>.attempts` count and `retry.<name>.latency` metrics.
     """
 
-    def _retry(func):
+    name: str
+    attempts: int = 5
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+    multiplier: float = 2.0
+    jitter: float = 0.5
+    budget: Optional[float] = None
+    predicate: Callable[[Any], bool] = bool
+    retry_on: Tuple[type, ...] = ()
+
+    _scope = threading.local()
+
+    @classmethod
+    @contextmanager
+    def deadline_scope(cls, deadline: Optional[float]):
+        """Set deadline for all policies run in current thread"""
+
+        previous = getattr(cls._scope, "deadline", None)
+        cls._scope.deadline = deadline
+        try:
+            yield
+        finally:
+            cls._scope.deadline = previous
+
+    @classmethod
+    def current_deadline(cls) -> Optional[float]:
+        """Deadline of enclosing deadline_scope"""
+
+        return getattr(cls._scope, "deadline", None)
+
+    def delay(self, attempt: int) -> float:
+        """Backoff delay after failed attempt number `attempt` (0 based)"""
+
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** attempt)
+        return delay * (1 - self.jitter * random.random())
+
+    def run(self, func: Callable, *args, deadline: Optional[float] = None, **kwargs) -> Any:
+        """Call function until predicate accepts result. Last result is returned when policy gives up. Exception
+        listed in `retry_on` is re-raised when it happened on the last attempt.
+        """
+
+        started = clock.time()
+        deadlines = [limit for limit in (deadline, self.current_deadline(),
+                                         started + self.budget if self.budget is not None else None) if limit]
+        deadline = min(deadlines) if deadlines else None
+        result = None
+        for attempt in range(self.attempts):
+            attempt_start = clock.perf_counter()
+            error = None
+            try:
+                result = func(*args, **kwargs)
+            except self.retry_on as raised:
+                error = raised
+            metrics.increment(f"retry.{self.name}.attempts")
+            metrics.observe(f"retry.{self.name}.latency", clock.perf_counter() - attempt_start)
+            if error is None and self.predicate(result):
+                return result
+
+            pause = self.delay(attempt)
+            last_attempt = attempt == self.attempts - 1
+            if last_attempt or (deadline is not None and clock.time() + pause > deadline):
+                metrics.increment(f"retry.{self.name}.gave_up")
+                if error is not None:
+                    raise error
+                return result
+            clock.sleep(pause)
+        return result
+
+    def __call__(self, func: Callable) -> Callable:
+        """Use policy as decorator"""
+
         @wraps(func)
         def wrapper(*args, **kwargs):
-            for n in range(times):
-                result = func(*args, **kwargs)
-                if result and len(result) > 1:
-                    return result
-                time.sleep(0.1)
-            return func(*args, **kwargs)
+            return self.run(func, *args, **kwargs)
 
         return wrapper
 
-    return _retry
+
+class JoinDeadline:
+    """Deadline of one join pipeline derived from meeting start.
+
+    `target` is the moment Join must be pressed, `hard` is the moment join gives up (meeting start + late join grace).
+    Every mandatory stage runs inside `stage(name, budget)`: its retries stop once both its budget and the time left
+    until target are used up (never after `hard`), and time spent beyond the budget (capped by time left until
+    target) is recorded as `stage.<name>.overrun`.
+    Optional work asks `allows(name, cost)` first and is skipped (`stage.<name>.skipped`) when it would cut into
+    `reserve` seconds kept free before target for the Join press.
+    """
+
+    def __init__(self, target: float, hard: Optional[float] = None, reserve: float = 1.5):
+        self.target = target
+        self.hard = hard
+        self.reserve = reserve
+
+    def remaining(self) -> float:
+        """Seconds left for optional work before target"""
+
+        return self.target - self.reserve - clock.time()
+
+    def allows(self, name: str, cost: float) -> bool:
+        """True if optional work of expected `cost` seconds fits before target. Skipped work is counted"""
+
+        if self.remaining() >= cost:
+            return True
+        metrics.increment(f"stage.{name}.skipped")
+        return False
+
+    @contextmanager
+    def stage(self, name: str, budget: float):
+        """Run mandatory stage with retry deadline and record its budget overrun"""
+
+        started = clock.time()
+        allotted = min(budget, max(0.0, self.target - started))
+        # Stage may use whatever is left until target, a late stage still gets its own budget
+        limits = [limit for limit in (self.hard, RetryPolicy.current_deadline()) if limit]
+        deadline = min(limits + [started + max(budget, self.target - started)])
+        try:
+            with RetryPolicy.deadline_scope(deadline):
+                yield
+        finally:
+            elapsed = clock.time() - started
+            metrics.observe(f"stage.{name}.latency", elapsed)
+            if elapsed > allotted:
+                metrics.increment(f"stage.{name}.overrun")
+                metrics.observe(f"stage.{name}.overrun_seconds", elapsed - allotted)
 
 
 @dataclass(init=False, order=True)
@@ -68,6 +260,8 @@ class SearchPattern:
     subject_unknown = 'New Window | Microsoft Teams'
     microsoft_teams = re.compile(pattern="Microsoft Teams")
     join_button_patt = "Join With"
+    # In-call UI: hang-up button name differs between Teams versions ("Leave", "Hang up")
+    in_call_control_names = ("Leave", "Hang up")
     microphone_control_name = "Microphone"
     video_options = "Video options"
     camera_control_name = "Camera"
@@ -80,6 +274,103 @@ class SearchPattern:
             self.subject_name = new_name
 
 
+class _TitleAutomaton:
+    """Pure Python Aho-Corasick automaton with the subset of `ahocorasick.Automaton` interface used by
+    WindowTitleMatcher. Scan cost depends on title length and number of matches, not on number of names
+    """
+
+    def __init__(self):
+        self.goto: List[Dict[str, int]] = [dict()]
+        self.fail: List[int] = [0]
+        self.output: List[List[Any]] = [list()]
+
+    def add_word(self, word: str, value: Any):
+        state = 0
+        for character in word:
+            following = self.goto[state].get(character)
+            if following is None:
+                following = len(self.goto)
+                self.goto[state][character] = following
+                self.goto.append(dict())
+                self.fail.append(0)
+                self.output.append(list())
+            state = following
+        self.output[state].append(value)
+
+    def make_automaton(self):
+        """Breadth first pass setting failure links, outputs of failure states are merged in"""
+
+        pending = deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for character, following in self.goto[state].items():
+                pending.append(following)
+                fallback = self.fail[state]
+                while fallback and character not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[following] = self.goto[fallback].get(character, 0)
+                self.output[following] = self.output[following] + self.output[self.fail[following]]
+
+    def iter(self, text: str):
+        """Yield (end index, value) of every occurrence, overlapping ones included"""
+
+        state = 0
+        for index, character in enumerate(text):
+            while state and character not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(character, 0)
+            for value in self.output[state]:
+                yield index, value
+
+
+class WindowTitleMatcher:
+    """Match window titles against all pending meeting window names in one pass.
+
+    Built once per schedule refresh. Uses Aho-Corasick automaton: the C one of optional `pyahocorasick` package when
+    it is installed, pure Python `_TitleAutomaton` otherwise. Both scan a title at flat cost in the number of names.
+    Overlapping names (e.g. 'Sync' and 'Team Sync') are all reported, same as plain substring search.
+    `use_automaton=False` uses one precompiled regular expression over escaped names instead: its cost grows with the
+    number of names and of names starting at the same position only the longest one is reported.
+    """
+
+    def __init__(self, names: List[str], use_automaton: bool = True):
+        self.names = sorted({name for name in names if name} | {SearchPattern.subject_unknown}, key=len, reverse=True)
+        self.automaton = None
+        self.pattern = None
+        if use_automaton:
+            self.automaton = ahocorasick.Automaton() if ahocorasick is not None else _TitleAutomaton()
+            for name in self.names:
+                self.automaton.add_word(name, name)
+            self.automaton.make_automaton()
+        else:
+            # Zero-width lookahead reports overlapping names starting at different positions
+            alternation = "|".join(re.escape(name) for name in self.names)
+            self.pattern = re.compile(f"(?=({alternation}))")
+
+    @classmethod
+    def from_meetings(cls, meetings: List[Tuple[float, str, SearchPattern, Any]],
+                      use_automaton: bool = True) -> WindowTitleMatcher:
+        """Build matcher for meeting list returned by CalendarSource.available_meetings"""
+
+        return cls([search_pattern.subject_name for _, _, search_pattern, _ in meetings], use_automaton)
+
+    def names_in(self, title: str) -> set:
+        """All known window names found in title"""
+
+        if self.automaton is not None:
+            return {name for _, name in self.automaton.iter(title)}
+        return set(self.pattern.findall(title))
+
+    def resolve(self, windows: List[DataStorage]) -> Dict[str, List[int]]:
+        """Single pass over enumerated windows. Map every known window name to its window handlers"""
+
+        resolved = dict()
+        for window in windows:
+            for name in self.names_in(window.name):
+                resolved.setdefault(name, list()).append(window.handler)
+        return resolved
+
+
 @dataclass(init=False)
 class ControlType:
     PaneControlType: int = 50033
@@ -88,90 +379,314 @@ class ControlType:
     DocumentControlType: int = 50030
 
 
-class OutlookApi:
-    """Main class for Outlook API.
+class _CountedDispatch:
+    """Transparent wrapper of COM object which counts COM round trips into `stats.com_calls`: property reads and
+    writes, method calls, default value conversions and collection item fetches. COM objects it returns are wrapped
+    too. Used only inside broker apartment thread
+    """
 
-    More information about meetings:
-    https://docs.microsoft.com/en-us/office/vba/api/outlook.itemproperties
-    https://office365itpros.com/2019/10/29/outlook-properties-mark-online-meetings/
-    https://docs.microsoft.com/en-us/openspecs/exchange_server_protocols/ms-ascal/aa63e887-2e0c-487f-a1a9-d4466708a31b
+    __slots__ = ("_target", "_stats")
 
-    MeetingItem info:
-    https://docs.microsoft.com/en-us/office/vba/api/outlook.items.restrict
-    https://docs.microsoft.com/en-us/office/vba/api/outlook.meetingitem
-    """
+    def __init__(self, target: Any, stats: DataStorage):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_stats", stats)
 
-    def __init__(self, time_before: int = 3 * 60):
-        self.outlook = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
-        self.folders = self._enumerate_outlook_folders()
-        self.start_before = time_before
+    def _wrap(self, value: Any) -> Any:
+        return _CountedDispatch(value, self._stats) if hasattr(value, "_oleobj_") else value
 
-    def _enumerate_outlook_folders(self) -> DataStorage:
-        """Enumerate Outlook folders"""
+    def __getattr__(self, name: str) -> Any:
+        value = getattr(self._target, name)
+        if not hasattr(value, "_oleobj_") and callable(value):
+            # Method lookup is not a round trip, its call is
+            @wraps(value)
+            def method(*args, **kwargs):
+                self._stats.com_calls += 1
+                return self._wrap(value(*args, **kwargs))
 
-        folders = DataStorage()
+            return method
+        self._stats.com_calls += 1
+        return self._wrap(value)
 
-        for num in range(50):
+    def __setattr__(self, name: str, value: Any):
+        self._stats.com_calls += 1
+        setattr(self._target, name, value)
 
-            try:
-                folder = self.outlook.GetDefaultFolder(num)
-                setattr(folders, folder.Name, num)
-            except pywintypes.com_error:
-                pass
+    def __iter__(self):
+        for item in self._target:
+            self._stats.com_calls += 1
+            yield self._wrap(item)
 
-        return folders
+    def __str__(self) -> str:
+        self._stats.com_calls += 1
+        return str(self._target)
+
+    def __int__(self) -> int:
+        self._stats.com_calls += 1
+        return int(self._target)
 
-    @staticmethod
-    def _get_event_item_properties(event) -> List[str]:
-        """Introspect each scheduled event properties and retrieve everything."""
 
-        properties = event.ItemProperties
-        event_data = list()
+class ComBroker:
+    """Route every COM call through one dedicated apartment thread.
 
+    Callers submit functions which receive the apartment's COM object (created by `factory` inside the apartment).
+    Each call waits at most `timeout` seconds. When a call hangs (Outlook modal dialog, sync, slow PST) it is
+    abandoned together with its apartment thread: a fresh apartment is started, the factory is called again and the
+    still queued requests are moved over, so one stall never blocks other callers. Functions get the COM object
+    wrapped in `_CountedDispatch`, so `stats.com_calls` counts real COM round trips.
+
+    Reference:
+    https://docs.microsoft.com/en-us/windows/win32/com/single-threaded-apartments
+    """
+
+    def __init__(self, factory: Callable[[], Any], timeout: float = 10.0, name: str = "ComBroker"):
+        self.factory = factory
+        self.timeout = timeout
+        self.name = name
+        self.stats = DataStorage()
+        setattr(self.stats, "calls", 0)
+        setattr(self.stats, "errors", 0)
+        setattr(self.stats, "timeouts", 0)
+        setattr(self.stats, "restarts", 0)
+        setattr(self.stats, "com_calls", 0)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._requests = None
+        self._closed = False
+        self._start_apartment()
+
+    def _start_apartment(self):
+        """Start new apartment thread with its own request queue"""
+
+        self._requests = queue.Queue()
+        thread = threading.Thread(target=self._apartment_loop, args=(self._requests, self._generation),
+                                  name=f"{self.name}-{self._generation}", daemon=True)
+        thread.start()
+
+    def _apartment_loop(self, requests: queue.Queue, generation: int):
+        """Apartment thread body. Initialize COM, create COM object lazily and serve queued requests"""
+
+        pythoncom.CoInitialize()
+        com_object = None
         try:
-            for num in range(120):
-                event_data.append(properties.Item(num).__str__())
-        except pywintypes.com_error:
-            pass
-        return event_data
+            while True:
+                request = requests.get()
+                if request is None:
+                    break
+                func, future = request
+                if not future.set_running_or_notify_cancel():
+                    continue
+                setattr(future, "generation", generation)
+                try:
+                    if com_object is None:
+                        com_object = _CountedDispatch(self.factory(), self.stats)
+                    future.set_result(func(com_object))
+                except BaseException as error:
+                    future.set_exception(error)
+        finally:
+            com_object = None
+            pythoncom.CoUninitialize()
+
+    def _abandon_apartment(self, generation: int):
+        """Abandon hung apartment. Move pending requests to a new apartment"""
+
+        with self._lock:
+            if generation != self._generation or self._closed:
+                return
+            old_requests = self._requests
+            self._generation += 1
+            self.stats.restarts += 1
+            self._start_apartment()
+            while True:
+                try:
+                    request = old_requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    self._requests.put(request)
+            # Let hung thread exit if the stalled call ever returns
+            old_requests.put(None)
+
+    def submit(self, func: Callable[[Any], Any]) -> Future:
+        """Queue function for the apartment thread. Returned Future can be cancelled while it is still queued"""
+
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is shut down")
+            self.stats.calls += 1
+            self._requests.put((func, future))
+        return future
+
+    def call(self, func: Callable[[Any], Any], timeout: Optional[float] = None) -> Any:
+        """Run function in apartment thread and wait for result. Raise TimeoutError when deadline is exceeded"""
+
+        timeout = self.timeout if timeout is None else timeout
+        future = self.submit(func)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            if not future.cancel():
+                if future.done():
+                    return future.result()
+                self._abandon_apartment(getattr(future, "generation", self._generation))
+            with self._lock:
+                self.stats.timeouts += 1
+            raise TimeoutError(f"{self.name} call {getattr(func, '__name__', func)!r} exceeded {timeout} s")
+        except BaseException:
+            with self._lock:
+                self.stats.errors += 1
+            raise
+
+    def shutdown(self):
+        """Stop current apartment thread. Queued requests are cancelled"""
+
+        with self._lock:
+            self._closed = True
+            while True:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is not None:
+                    request[1].cancel()
+            self._requests.put(None)
+
+
+class JoinLatencyHistory:
+    """Small local history of measured join latencies (URL open -> window -> controls -> Join pressed).
+
+    Failed and timed out joins are stored too (`failed`), as the time they took before giving up, so slow joins keep
+    the lead time up instead of dropping out of history. Lead time is a high percentile of recent latencies multiplied
+    by `safety`. With `per_hour` the samples of the meeting's start hour are used once there are at least
+    `min_samples` of them, since load differs across the day. Back-to-back hand-offs (leave previous call -> window
+    reused -> controls -> Join pressed) are stored as `handoff` records and estimated separately, at least
+    `handoff_minimum`. History without `path` is kept in memory only.
+    """
 
-    def _sort_calendar_meeting_object(self) -> List:
-        """Sort today`s existing meetings from Outlook Calendar"""
+    def __init__(self, path: Optional[str], size: int = 200, percentile: float = 0.95, safety: float = 1.25,
+                 minimum: float = 10.0, min_samples: int = 5, per_hour: bool = False, handoff_minimum: float = 2.0):
+        self.path = path
+        self.size = size
+        self.percentile = percentile
+        self.safety = safety
+        self.minimum = minimum
+        self.min_samples = min_samples
+        self.per_hour = per_hour
+        self.handoff_minimum = handoff_minimum
+        self._lock = threading.Lock()
+        self.records = self._load() if path else list()
+
+    def _load(self) -> List[dict]:
+        """Read history file. Missing or broken file starts empty history"""
 
-        calendar = self.outlook.getDefaultFolder(self.folders.Calendar).Items
-        calendar.IncludeRecurrences = True
-        calendar.Sort("[Start]")
+        try:
+            with open(self.path) as file:
+                records = json.load(file)
+        except FileNotFoundError:
+            return list()
+        except (ValueError, OSError) as error:
+            warnings.warn(f"Join latency history {self.path} was not loaded: {error}")
+            return list()
+        if not isinstance(records, list):
+            warnings.warn(f"Join latency history {self.path} was not loaded: list expected")
+            return list()
+        return [record for record in records if self._valid(record)][-self.size:]
 
-        # DEBUG here. If you want to shorten meeting waiting time
-        # Modify date by needs
-        today_date = datetime.datetime.today()
-        tomorrow_date = datetime.timedelta(days=1) + today_date
-        begin_day = today_date.date().strftime("%m/%d/%Y")
-        end_day = tomorrow_date.date().strftime("%m/%d/%Y")
+    @staticmethod
+    def _valid(record: Any) -> bool:
+        return isinstance(record, dict) and isinstance(record.get("latency"), (int, float)) and isinstance(
+            record.get("hour"), int)
+
+    def _save(self):
+        """Write history file atomically"""
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{self.path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.records, file)
+        os.replace(temporary, self.path)
+
+    def record(self, latency: float, start: float, stages: Optional[dict] = None, failed: bool = False,
+               handoff: bool = False):
+        """Store measured join latency of meeting starting at `start` timestamp. Failed join stores time it took"""
+
+        record = dict(latency=round(latency, 3), hour=datetime.datetime.fromtimestamp(start).hour,
+                      recorded=round(clock.time()), stages={name: round(value, 3) for name, value in
+                                                           (stages or dict()).items()})
+        if failed:
+            record["failed"] = True
+        if handoff:
+            record["handoff"] = True
+        with self._lock:
+            self.records.append(record)
+            del self.records[:-self.size]
+            if not self.path:
+                return
+            try:
+                self._save()
+            except OSError as error:
+                warnings.warn(f"Join latency history {self.path} was not saved: {error}")
+
+    def lead_time(self, hour: Optional[int] = None, handoff: bool = False) -> Optional[float]:
+        """Estimated lead time in seconds of cold join or of `handoff`. None when there is not enough history"""
+
+        with self._lock:
+            records = [record for record in self.records if record.get("handoff", False) == handoff]
+            latencies = [record["latency"] for record in records]
+            if self.per_hour and hour is not None:
+                hourly = [record["latency"] for record in records if record["hour"] == hour]
+                if len(hourly) >= self.min_samples:
+                    latencies = hourly
+        if len(latencies) < self.min_samples:
+            return None
+        latencies.sort()
+        rank = min(len(latencies) - 1, math.ceil(self.percentile * len(latencies)) - 1)
+        return max(self.handoff_minimum if handoff else self.minimum, latencies[rank] * self.safety)
+
+
+class ColdStartHistory(JoinLatencyHistory):
+    """Measured Teams cold starts (launch until responsive) of TeamsSupervisor. Records carry only latency and time
+    of measurement. Supervisor adds its own margin to the estimate: no safety factor and no join latency floor
+    """
 
-        # return Items collection of MeetingItem
-        meeting_plan = calendar.Restrict("[Start] >= '" + begin_day + "' AND [END] <= '" + end_day + "'")
+    def __init__(self, path: Optional[str], size: int = 50, percentile: float = 0.9, min_samples: int = 3):
+        super().__init__(path, size=size, percentile=percentile, safety=1.0, minimum=0.0, min_samples=min_samples)
 
-        return meeting_plan
+    @staticmethod
+    def _valid(record: Any) -> bool:
+        return isinstance(record, dict) and isinstance(record.get("latency"), (int, float))
 
-    def _populate_meeting_events(self, event_items: List) -> Generator[DataStorage, None, None]:
-        """Iterate through list of MeetingItem and parse the meeting data"""
-        for appointment in event_items:
-            appointment_properties = self._get_event_item_properties(appointment)
-            event = DataStorage()
-            setattr(event, "Start", appointment.Start)
-            setattr(event, "End", appointment.End)
-            setattr(event, "Subject", appointment.Subject)
-            setattr(event, "Duration", appointment.Duration)
-            setattr(event, "Location", appointment.Location)
-            setattr(event, "GetOrganizer", appointment.GetOrganizer().__str__())
-            setattr(event, "IsRecurring", appointment.IsRecurring)
-            setattr(event, "GetRecurrencePattern", appointment.GetRecurrencePattern().__int__())
-            setattr(event, "Body", appointment.Body)
-            setattr(event, "Display", appointment.Display)
-            setattr(event, "Properties", appointment_properties)
+    def record(self, latency: float):
+        """Store measured cold start"""
 
-            yield event
+        with self._lock:
+            self.records.append(dict(latency=round(latency, 3), recorded=round(clock.time())))
+            del self.records[:-self.size]
+            if not self.path:
+                return
+            try:
+                self._save()
+            except OSError as error:
+                warnings.warn(f"Teams cold start history {self.path} was not saved: {error}")
+
+
+class CalendarSource(ABC):
+    """Base class of calendar sources. Subclass implements `read_events`, which returns meeting events as
+    DataStorage objects with at least Start, Subject, GetOrganizer, Location, Properties and Display attributes.
+    Waiting, lead time and URL opening logic is shared by all sources.
+    """
+
+    open_url_policy = RetryPolicy(name="open_url", attempts=3, base_delay=0.5, max_delay=2.0)
+    # Copies of one meeting (forwarded, shared calendar, occurrence + exception) start within this many seconds
+    duplicate_tolerance = 300
+    # Progress bar refresh period, seconds
+    progress_interval = 5.0
+
+    def __init__(self, time_before: int = 3 * 60, latency_history: Optional[JoinLatencyHistory] = None):
+        self.start_before = time_before
+        self.latency_history = latency_history
 
     @staticmethod
     def _print_bar(meeting: str, total: int, current: int, bar_size: int = 100):
@@ -185,12 +700,12 @@ class OutlookApi:
     def progress_bar(self, meeting: str, waiting_total: int, bar_size: int = 100):
         """Progress bar"""
 
-        start = time.time()
+        start = clock.time()
         duration = waiting_total
-        while duration > time.time() - start:
-            current_time = int(time.time() - start)
+        while duration > clock.time() - start:
+            current_time = int(clock.time() - start)
             self._print_bar(meeting=meeting, total=waiting_total, current=current_time, bar_size=bar_size)
-            time.sleep(5)
+            clock.sleep(max(0.0, min(self.progress_interval, duration - (clock.time() - start))))
         self._print_bar(meeting=meeting, total=waiting_total, current=waiting_total, bar_size=bar_size)
 
     @staticmethod
@@ -237,14 +752,42 @@ class OutlookApi:
             url_result = self._parse_teams_meet_join_url(meeting_object)
             meeting_time = datetime.datetime(meet_start.year, meet_start.month, meet_start.day, meet_start.hour,
                                              meet_start.minute, meet_start.second)
-            waiting_time = meeting_time - datetime.datetime.now()
+            waiting_time = meeting_time - clock.now()
+            setattr(meeting_object, "StartTimestamp", meeting_time.timestamp())
+            meet_end = getattr(meeting_object, "End", None)
+            if meet_end is not None:
+                setattr(meeting_object, "EndTimestamp", datetime.datetime(meet_end.year, meet_end.month, meet_end.day,
+                                                                          meet_end.hour, meet_end.minute,
+                                                                          meet_end.second).timestamp())
 
             waiting_process.append(
                 (waiting_time.total_seconds(), url_result, possible_win_name, meeting_object))
         return waiting_process
 
-    def wait_for_meeting(self, meeting_data: Tuple[float, str, SearchPattern, Any]) -> bool:
-        """Wait for meeting. Join the meeting 3 minutes before start"""
+    def lead_time(self, meet_object: DataStorage, join_before: float = 0) -> float:
+        """Seconds before meeting start to begin warm-up. Learned from join latency history, `start_before` is the
+        upper bound
+        """
+
+        if self.latency_history is None:
+            return self.start_before
+        start_hour = datetime.datetime.fromtimestamp(meet_object.StartTimestamp).hour
+        estimate = self.latency_history.lead_time(hour=start_hour)
+        if estimate is None:
+            return self.start_before
+        return min(self.start_before, join_before + estimate)
+
+    def handoff_lead(self, default: float) -> float:
+        """Seconds before next Join press to leave previous back-to-back call. Learned from measured hand-offs,
+        `default` until there are enough of them
+        """
+
+        estimate = self.latency_history.lead_time(handoff=True) if self.latency_history is not None else None
+        return default if estimate is None else estimate
+
+    def wait_for_lead_time(self, meeting_data: Tuple[float, str, SearchPattern, Any], join_before: float = 0,
+                           deadline: Optional[JoinDeadline] = None) -> bool:
+        """Wait until meeting warm-up should begin. Progress bar is skipped when join `deadline` is already tight"""
 
         seconds, url, _, meet_object = meeting_data
         if not url:
@@ -252,13 +795,24 @@ class OutlookApi:
                 message=f"Meeting {meet_object.Subject} URL is missing: {url}. Check displayed OutLook window")
             return False
 
+        lead_time = self.lead_time(meet_object, join_before)
         text = f"Meeting via Teams which starts at: {meet_object.Start} >>> Subject: {meet_object.Subject} " \
-               f">>> Organizer: {meet_object.GetOrganizer} >>> Location: {meet_object.Location}"
+               f">>> Organizer: {meet_object.GetOrganizer} >>> Location: {meet_object.Location} " \
+               f">>> Warm-up {lead_time:.0f} s before"
         print(text)
         # DEBUG here. If you want to shorten the wait time
-        time_to_wait = seconds - self.start_before
-        self.progress_bar(meeting=meet_object.Subject, waiting_total=int(time_to_wait), bar_size=100)
-        return self._open_teams_meet_via_url(url)
+        time_to_wait = meet_object.StartTimestamp - clock.time() - lead_time
+        if time_to_wait >= 1 and (deadline is None or deadline.allows("progress", lead_time + 1)):
+            self.progress_bar(meeting=meet_object.Subject, waiting_total=int(time_to_wait), bar_size=100)
+        remaining = meet_object.StartTimestamp - clock.time() - lead_time
+        if remaining > 0:
+            clock.sleep(remaining)
+        return True
+
+    def open_meeting_url(self, url: str) -> bool:
+        """Open Teams meeting URL with retries"""
+
+        return self.open_url_policy.run(self._open_teams_meet_via_url, url)
 
     @staticmethod
     def drop_outdated_meetings(meetings: List[Tuple[float, str, SearchPattern, Any]]) -> List[
@@ -271,20 +825,252 @@ class OutlookApi:
                 meetings.pop(_enum)
         return meetings
 
+    @abstractmethod
+    def read_events(self) -> Optional[List[DataStorage]]:
+        """Read meeting events of lookahead window. Returns None when calendar could not be read"""
+
+    def deduplicate_meetings(self, meetings: List[Tuple[float, str, SearchPattern, Any]]) -> List[
+        Tuple[float, str, SearchPattern, Any]]:
+        """Collapse copies of the same meeting so that each one is joined once. Copy with join URL is kept"""
+
+        index = MeetingIndex(tolerance=self.duplicate_tolerance)
+        for meeting in meetings:
+            _, url, _, meet_object = meeting
+            identifiers = meeting_identifiers(url, getattr(meet_object, "GlobalAppointmentID", None))
+            position, new = index.add(identifiers, meet_object.StartTimestamp, meeting)
+            if not new and url and not index.entries[position][1]:
+                index.replace(position, meeting)
+        if index.duplicates:
+            metrics.increment("meetings.duplicates", index.duplicates)
+        return index.unique()
+
     def available_meetings(self):
-        """Main method of Outlook calendar logic."""
+        """Main method of calendar logic."""
 
-        all_meetings = self._sort_calendar_meeting_object()
-        parsed_meeting_data = ((meeting.Start, meeting) for meeting in self._populate_meeting_events(all_meetings))
+        all_meetings = self.read_events()
+        if all_meetings is None:
+            return list()
+        parsed_meeting_data = ((meeting.Start, meeting) for meeting in all_meetings)
         # sort meetings by time
         sorted_meetings = sorted(parsed_meeting_data)
-        waiting_meetings = self._meeting_time_and_url_mapper(sorted_meetings)
+        waiting_meetings = self.deduplicate_meetings(self._meeting_time_and_url_mapper(sorted_meetings))
 
         # Remove and drop outdated meetings.
         current_meetings = self.drop_outdated_meetings(waiting_meetings)
         return current_meetings
 
 
+class OutlookApi(CalendarSource):
+    """Main class for Outlook API.
+
+    More information about meetings:
+    https://docs.microsoft.com/en-us/office/vba/api/outlook.itemproperties
+    https://office365itpros.com/2019/10/29/outlook-properties-mark-online-meetings/
+    https://docs.microsoft.com/en-us/openspecs/exchange_server_protocols/ms-ascal/aa63e887-2e0c-487f-a1a9-d4466708a31b
+
+    MeetingItem info:
+    https://docs.microsoft.com/en-us/office/vba/api/outlook.items.restrict
+    https://docs.microsoft.com/en-us/office/vba/api/outlook.meetingitem
+    """
+
+    # Outlook stalls are retried a few times only; empty calendar is valid result
+    read_policy = RetryPolicy(name="outlook_read", attempts=3, base_delay=1.0, max_delay=10.0,
+                              predicate=lambda result: result is not None,
+                              retry_on=(TimeoutError, pywintypes.com_error))
+
+    # MAPI properties read in one batch per item. Name -> property tag (schema name)
+    # https://docs.microsoft.com/en-us/office/vba/api/outlook.propertyaccessor.getproperties
+    property_tags = {
+        "JoinUrl": "http://schemas.microsoft.com/mapi/string/{00020329-0000-0000-C000-000000000046}/"
+                   "SkypeTeamsMeetingUrl",
+        "IsOnlineMeeting": "http://schemas.microsoft.com/mapi/id/{00062002-0000-0000-C000-000000000046}/8240000B",
+        "TeamsProperties": "http://schemas.microsoft.com/mapi/string/{00020329-0000-0000-C000-000000000046}/"
+                           "SkypeTeamsProperties",
+        "GlobalAppointmentID": "http://schemas.microsoft.com/mapi/id/{6ED8DA90-450B-101B-98DA-00AA003F1305}/00030102",
+        "LastModificationTime": "http://schemas.microsoft.com/mapi/proptag/0x30080040",
+    }
+
+    def __init__(self, time_before: int = 3 * 60, call_timeout: float = 10.0, read_timeout: float = 60.0,
+                 latency_history: Optional[JoinLatencyHistory] = None, property_tags: Optional[dict] = None):
+        super().__init__(time_before=time_before, latency_history=latency_history)
+        if property_tags is not None:
+            self.property_tags = dict(self.property_tags, **property_tags)
+        # All Outlook access goes through one COM apartment thread. Nothing else touches Outlook COM objects
+        self.broker = ComBroker(factory=self._dispatch_outlook, timeout=call_timeout, name="OutlookComBroker")
+        self.read_timeout = read_timeout
+        self.folders = self.read_policy.run(self.broker.call, self._enumerate_outlook_folders)
+
+    @staticmethod
+    def _dispatch_outlook():
+        """Create Outlook MAPI namespace. Called inside COM apartment thread"""
+
+        return win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
+
+    @property
+    def com_stats(self) -> DataStorage:
+        """Outlook COM call counters: broker calls, errors, timeouts, restarts and COM round trips (com_calls)"""
+
+        return self.broker.stats
+
+    @staticmethod
+    def _enumerate_outlook_folders(outlook) -> DataStorage:
+        """Enumerate Outlook folders"""
+
+        folders = DataStorage()
+
+        for num in range(50):
+
+            try:
+                folder = outlook.GetDefaultFolder(num)
+                setattr(folders, folder.Name, num)
+            except pywintypes.com_error:
+                pass
+
+        return folders
+
+    def _get_event_item_properties(self, event) -> dict:
+        """Read configured MAPI properties of scheduled event with one batched PropertyAccessor call.
+        Returns property values by name (None when property is absent).
+        """
+
+        names = list(self.property_tags)
+        try:
+            values = event.PropertyAccessor.GetProperties([self.property_tags[name] for name in names])
+        except pywintypes.com_error as error:
+            warnings.warn(f"Batched property read failed: {error}")
+            return dict.fromkeys(names)
+        event_data = dict()
+        for name, value in zip(names, values):
+            # Missing properties come back as error code (int) instead of raising
+            if isinstance(value, int) and not isinstance(value, bool) and value < 0:
+                value = None
+            elif isinstance(value, (bytes, memoryview)):
+                value = bytes(value).hex().upper()
+            event_data[name] = value
+        return event_data
+
+    def _sort_calendar_meeting_object(self, outlook) -> List:
+        """Sort today`s existing meetings from Outlook Calendar"""
+
+        calendar = outlook.getDefaultFolder(self.folders.Calendar).Items
+        calendar.IncludeRecurrences = True
+        calendar.Sort("[Start]")
+
+        # DEBUG here. If you want to shorten meeting waiting time
+        # Modify date by needs
+        today_date = clock.now()
+        tomorrow_date = datetime.timedelta(days=1) + today_date
+        begin_day = today_date.date().strftime("%m/%d/%Y")
+        end_day = tomorrow_date.date().strftime("%m/%d/%Y")
+
+        # return Items collection of MeetingItem
+        meeting_plan = calendar.Restrict("[Start] >= '" + begin_day + "' AND [END] <= '" + end_day + "'")
+
+        return meeting_plan
+
+    def _populate_meeting_events(self, event_items: List) -> Generator[DataStorage, None, None]:
+        """Iterate through list of MeetingItem and parse the meeting data. COM round trips of every item (its fetch
+        included) are measured by broker counter
+        """
+
+        counted = self.broker.stats.com_calls
+        for appointment in event_items:
+            appointment_properties = self._get_event_item_properties(appointment)
+            event = DataStorage()
+            setattr(event, "Start", appointment.Start)
+            setattr(event, "End", appointment.End)
+            setattr(event, "Subject", appointment.Subject)
+            setattr(event, "Duration", appointment.Duration)
+            setattr(event, "Location", appointment.Location)
+            setattr(event, "GetOrganizer", appointment.GetOrganizer().__str__())
+            setattr(event, "IsRecurring", appointment.IsRecurring)
+            setattr(event, "GetRecurrencePattern", appointment.GetRecurrencePattern().__int__())
+            setattr(event, "Body", appointment.Body)
+            setattr(event, "EntryID", appointment.EntryID)
+            setattr(event, "Display", partial(self._display_item, event.EntryID))
+            for name, value in appointment_properties.items():
+                setattr(event, name, value)
+            # Join URL may live in named property, location or body
+            setattr(event, "Properties", [str(value) for value in (appointment_properties.get("JoinUrl"),
+                                                                    appointment_properties.get("TeamsProperties"),
+                                                                    event.Location, event.Body) if value])
+            com_calls = self.broker.stats.com_calls - counted
+            counted = self.broker.stats.com_calls
+            setattr(event, "ComCalls", com_calls)
+            metrics.increment("outlook.items")
+            metrics.increment("outlook.item_com_calls", com_calls)
+            metrics.observe("outlook.com_calls_per_item", com_calls)
+
+            yield event
+
+    def _read_calendar_events(self, outlook) -> List[DataStorage]:
+        """Read today`s meeting data. Called inside COM apartment thread, so COM objects never leave it"""
+
+        return list(self._populate_meeting_events(self._sort_calendar_meeting_object(outlook)))
+
+    def _display_item(self, entry_id: str):
+        """Display Outlook item. Item is looked up by EntryID in COM apartment thread"""
+
+        try:
+            self.broker.call(lambda outlook: outlook.GetItemFromID(entry_id).Display())
+        except (TimeoutError, pywintypes.com_error) as error:
+            warnings.warn(f"Outlook item could not be displayed: {error}")
+
+    def read_events(self) -> Optional[List[DataStorage]]:
+        """Read today`s meetings from Outlook calendar"""
+
+        try:
+            return self.read_policy.run(self.broker.call, self._read_calendar_events, timeout=self.read_timeout)
+        except (TimeoutError, pywintypes.com_error) as error:
+            warnings.warn(f"Outlook calendar was not read: {error}")
+            return None
+
+
+class IcsCalendar(CalendarSource):
+    """Calendar source reading exported iCalendar (.ics) file. File is streamed, recurrences are expanded only
+    inside lookahead window (see ics_calendar module)
+    """
+
+    def __init__(self, path: str, time_before: int = 3 * 60, latency_history: Optional[JoinLatencyHistory] = None,
+                 lookahead_days: int = 1):
+        super().__init__(time_before=time_before, latency_history=latency_history)
+        self.path = path
+        self.lookahead_days = lookahead_days
+
+    def _display_event(self, subject: str):
+        """There is no calendar window to open. Point user to the source file"""
+
+        warnings.warn(f"Meeting {subject!r} has no Teams join URL. Check {self.path}")
+
+    def read_events(self) -> Optional[List[DataStorage]]:
+        """Read today`s meetings from .ics file"""
+
+        begin = datetime.datetime.combine(clock.now().date(), datetime.time())
+        end = begin + datetime.timedelta(days=self.lookahead_days)
+        try:
+            ics_events = ics_calendar.read_events(self.path, begin, end)
+        except (OSError, ValueError) as error:
+            warnings.warn(f"Calendar file {self.path} was not read: {error}")
+            return None
+
+        events = list()
+        for ics_event in ics_events:
+            event = DataStorage()
+            setattr(event, "Start", ics_event.start)
+            setattr(event, "End", ics_event.end)
+            setattr(event, "Subject", ics_event.subject)
+            setattr(event, "Duration", int((ics_event.end - ics_event.start).total_seconds() // 60))
+            setattr(event, "Location", ics_event.location)
+            setattr(event, "GetOrganizer", ics_event.organizer)
+            setattr(event, "Body", ics_event.description)
+            setattr(event, "JoinUrl", ics_event.join_url)
+            setattr(event, "GlobalAppointmentID", ics_event.uid)
+            setattr(event, "Display", partial(self._display_event, ics_event.subject))
+            setattr(event, "Properties", [ics_event.join_url] if ics_event.join_url else list())
+            events.append(event)
+        return events
+
+
 class EnumActiveWindows:
     """Enumerate windows. Activate windows.
 
@@ -292,8 +1078,13 @@ class EnumActiveWindows:
     https://docs.microsoft.com/en-us/windows/win32/api/winuser/nf-winuser-showwindow
     """
 
+    # Concurrent waiting meetings share one enumeration and one matcher pass within this time (seconds)
+    resolve_max_age = 0.2
+
     def __init__(self):
         self.enum_windows = list()
+        self._resolve_lock = threading.Lock()
+        self._resolved = (None, 0.0, dict())
 
     @staticmethod
     def _get_window_info(hwnd, enum_windows: list):
@@ -314,19 +1105,51 @@ class EnumActiveWindows:
     def enumerate_windows(self):
         """Retrieve enumerated active windows"""
 
-        win32gui.EnumWindows(self._get_window_info, self.enum_windows)
-        return self.enum_windows
+        enum_windows = list()
+        win32gui.EnumWindows(self._get_window_info, enum_windows)
+        self.enum_windows = enum_windows
+        return enum_windows
 
     @staticmethod
     def validate_teams_open_window(enumerated: List[DataStorage], search_pattern: SearchPattern) -> List[int]:
         """Find open Teams window. Search is based on meeting.Subject name"""
 
-        teams_window = [window.handler for window in enumerated if search_pattern.subject_name in window.name]
+        teams_window = list()
+        if search_pattern.subject_name:
+            teams_window = [window.handler for window in enumerated if search_pattern.subject_name in window.name]
         if not teams_window:
             teams_window = [window.handler for window in enumerated if
                             search_pattern.subject_unknown in window.name]
         return teams_window
 
+    def resolve_windows(self, matcher: WindowTitleMatcher) -> Dict[str, List[int]]:
+        """Enumerate windows and resolve all meeting window names at once. Result is shared for `resolve_max_age`"""
+
+        with self._resolve_lock:
+            cached_matcher, resolved_at, resolved = self._resolved
+            if cached_matcher is matcher and clock.monotonic() - resolved_at < self.resolve_max_age:
+                return resolved
+            resolved = matcher.resolve(self.enumerate_windows)
+            self._resolved = (matcher, clock.monotonic(), resolved)
+            return resolved
+
+    def find_teams_window(self, search_pattern: SearchPattern,
+                          matcher: Optional[WindowTitleMatcher] = None) -> List[int]:
+        """Find open Teams window of meeting. Use shared matcher pass when matcher is provided"""
+
+        if matcher is None:
+            return self.validate_teams_open_window(self.enumerate_windows, search_pattern)
+        resolved = self.resolve_windows(matcher)
+        return resolved.get(search_pattern.subject_name) or resolved.get(search_pattern.subject_unknown, list())
+
+    @staticmethod
+    def window_title(window_handler) -> str:
+        """Current title of window, empty when window is gone"""
+
+        if not win32gui.IsWindow(window_handler):
+            return ""
+        return win32gui.GetWindowText(window_handler)
+
     @staticmethod
     def activate_window(window_handler):
         """Retrieve window handler by search pattern. Set window as foreground window."""
@@ -336,6 +1159,169 @@ class EnumActiveWindows:
         win32gui.SetCapture(window_handler)
 
 
+class TeamsSupervisor:
+    """Keep Teams client running and responsive ahead of joins, so that its cold start never lands on a join's
+    critical path.
+
+    Teams is checked (process window present and answering window messages) from `cold_start + margin` seconds before
+    every warm-up and launched when it is not running. Cold start estimate is a high percentile of measured cold starts
+    (launch until responsive) in `history` (ColdStartHistory), `cold_start` is used until there are enough of them.
+    When a warm-up follows the previous one within `keep_warm_gap` seconds (meeting heavy period), Teams is probed
+    every `keep_warm_interval` seconds in between and relaunched when it is gone. Supervisor runs in own daemon thread
+    and sleeps at least `min_interval` seconds between wake-ups.
+
+    Reference:
+    https://docs.microsoft.com/en-us/windows/win32/api/winuser/nf-winuser-sendmessagetimeoutw
+    """
+
+    executable_names = ("teams.exe", "ms-teams.exe")
+    # Protocol handler starts Teams client without opening any meeting
+    launch_url = "msteams:"
+    # Window which does not process WM_NULL within this time (seconds) is hung
+    hung_timeout = 2.0
+    ready_policy = RetryPolicy(name="teams_start", attempts=200, base_delay=0.5, max_delay=2.0, budget=180)
+
+    def __init__(self, enum: EnumActiveWindows, cold_start: float = 60.0, history: Optional[ColdStartHistory] = None,
+                 margin: float = 10.0, keep_warm_gap: float = 30 * 60, keep_warm_interval: float = 60.0,
+                 min_interval: float = 1.0):
+        self.enum = enum
+        self.cold_start = cold_start
+        self.history = history
+        self.margin = margin
+        self.keep_warm_gap = keep_warm_gap
+        self.keep_warm_interval = keep_warm_interval
+        self.min_interval = min_interval
+        self.warm_ups: List[float] = list()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def process_name(pid: int) -> str:
+        """Executable name of process, empty when process can not be queried"""
+
+        try:
+            handle = win32api.OpenProcess(win32con.PROCESS_QUERY_INFORMATION | win32con.PROCESS_VM_READ, False, pid)
+        except pywintypes.error:
+            return ""
+        try:
+            return os.path.basename(win32process.GetModuleFileNameEx(handle, 0)).lower()
+        except pywintypes.error:
+            return ""
+        finally:
+            win32api.CloseHandle(handle)
+
+    def teams_windows(self) -> List[int]:
+        """Titled top-level windows of Teams client processes"""
+
+        names = dict()
+        teams_window = list()
+        for window in self.enum.enumerate_windows:
+            if not window.name:
+                continue
+            if window.pid not in names:
+                names[window.pid] = self.process_name(window.pid)
+            if names[window.pid] in self.executable_names:
+                teams_window.append(window.handler)
+        return teams_window
+
+    def responsive(self, window_handler) -> bool:
+        """Window answers WM_NULL within `hung_timeout`"""
+
+        try:
+            win32gui.SendMessageTimeout(window_handler, win32con.WM_NULL, 0, 0, win32con.SMTO_ABORTIFHUNG,
+                                        int(self.hung_timeout * 1000))
+            return True
+        except pywintypes.error:
+            return False
+
+    def ready(self) -> bool:
+        """Teams client is running and its UI thread is responsive"""
+
+        return any(self.responsive(window_handler) for window_handler in self.teams_windows())
+
+    def launch(self) -> bool:
+        """Start Teams client"""
+
+        return webbrowser.open(self.launch_url)
+
+    def cold_start_estimate(self) -> float:
+        """Expected seconds from launch until Teams is responsive"""
+
+        estimate = self.history.lead_time() if self.history is not None else None
+        return self.cold_start if estimate is None else estimate
+
+    def ensure_ready(self, warm_up: float) -> bool:
+        """Launch Teams when it is not running and wait until it is responsive. Cold start of launch is measured"""
+
+        if self.ready():
+            return True
+        # Hung client: another launch would only queue behind it
+        launched = not self.teams_windows()
+        if launched:
+            metrics.increment("teams.launches")
+            if not self.launch():
+                warnings.warn("Teams client was not launched")
+                return False
+        else:
+            warnings.warn("Teams client is not responding. Waiting for it")
+            metrics.increment("teams.hung")
+        started = clock.perf_counter()
+        ready = self.ready_policy.run(self.ready)
+        if not ready:
+            warnings.warn("Teams client did not become responsive")
+            return False
+
+        waited = clock.perf_counter() - started
+        if clock.time() > warm_up:
+            metrics.increment("teams.cold_start_late")
+        if not launched:
+            # Recovery of hung client says nothing about cold start
+            metrics.observe("teams.hung_wait", waited)
+            return True
+        metrics.observe("teams.cold_start", waited)
+        if self.history is not None:
+            self.history.record(waited)
+        return True
+
+    def _run(self):
+        """Supervisor thread body"""
+
+        with clock.participant():
+            position = 0
+            while not self._stopped:
+                now = clock.time()
+                while position < len(self.warm_ups) and self.warm_ups[position] < now:
+                    position += 1
+                if position == len(self.warm_ups):
+                    return
+                warm_up = self.warm_ups[position]
+                # Probing starts cold start ahead of warm-up. Teams is kept warm between closely following warm-ups
+                probe_from = warm_up - self.cold_start_estimate() - self.margin
+                if position and warm_up - self.warm_ups[position - 1] < self.keep_warm_gap:
+                    probe_from = min(probe_from, self.warm_ups[position - 1])
+                # Waits are clamped: a warm-up at the current instant or failing checks must not spin the thread
+                if now < probe_from:
+                    clock.sleep(max(self.min_interval, probe_from - now))
+                    continue
+                self.ensure_ready(warm_up)
+                clock.sleep(max(self.min_interval, min(self.keep_warm_interval, warm_up - clock.time())))
+
+    def start(self, meetings_data: List[Tuple[float, str, SearchPattern, Any]], outlook: CalendarSource,
+              join_before: float = 0):
+        """Supervise Teams for warm-ups of `meetings_data`"""
+
+        self.warm_ups = sorted(meet_obj.StartTimestamp - outlook.lead_time(meet_obj, join_before) for
+                               *_, meet_obj in meetings_data)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="TeamsSupervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop supervising. Thread exits at its next wake-up"""
+
+        self._stopped = True
+
+
 class IUIAutomation:
     """ Reference regarding initializing UIAutomationCore, UUID.
     UIAutomationCore: https://docs.microsoft.com/en-us/windows/win32/winauto/uiauto-uiautomationoverview
@@ -476,7 +1462,9 @@ class IUIAutomation:
         y = (join.CurrentBoundingRectangle.bottom + join.CurrentBoundingRectangle.top) // 2
         return x, y
 
-    @retry(times=3)
+    # Sometimes join button is not parsed and length of parsed list of Control_5033 objects is less than 2
+    @RetryPolicy(name="pane_controls", attempts=4, base_delay=0.1, max_delay=0.5,
+                 predicate=lambda result: bool(result) and len(result) > 1)
     def region_control_siblings_from_document_control(self, walker, element, search_pattern: SearchPattern):
         """Retrieve two Pane ControlType: 50033 and assign Join button to class instance"""
 
@@ -492,14 +1480,29 @@ class IUIAutomation:
                 self.join_button = sibling
         return siblings_5033
 
+    def window_elements(self, window_handlers: List[int]) -> List:
+        """Window elements taken directly from known window handles, without walking desktop children"""
+
+        return [self.iui_automation.ElementFromHandle(handler) for handler in window_handlers]
+
+    @staticmethod
+    def center_x_y(element) -> Tuple[int, int]:
+        """Get element center x, y to press"""
+
+        rectangle = element.CurrentBoundingRectangle
+        return (rectangle.right + rectangle.left) // 2, (rectangle.bottom + rectangle.top) // 2
+
     def child_siblings_from_root_element(self, walker, root_element, search_pattern: SearchPattern, enum_wind: List):
         """Get child siblings from root element (Desktop)"""
 
-        to_search = search_pattern.subject_name if search_pattern.subject_name else search_pattern.subject_unknown
+        # Plain substring check: subjects may contain regex metacharacters like '(', '+' or '?'
+        to_search = [name for name in (search_pattern.subject_name, search_pattern.subject_unknown) if name]
         child_sibling = list()
         for sibling in self.iterate_over_elements(walker, root_element):
-            match = re.search(pattern=to_search, string=sibling.CurrentName.__str__())
-            if match and sibling.CurrentNativeWindowHandle in enum_wind:
+            if sibling.CurrentNativeWindowHandle not in enum_wind:
+                continue
+            sibling_name = sibling.CurrentName.__str__()
+            if any(name in sibling_name for name in to_search):
                 child_sibling.append(sibling)
         return child_sibling
 
@@ -530,6 +1533,27 @@ class IUIAutomation:
                 element.CurrentName == search_pattern.camera_control_name))
                                    ]
 
+    def in_call_control(self, walker, window_handlers: List[int], search_pattern: SearchPattern,
+                        max_elements: int = 3000):
+        """Breadth first search of Teams window for in-call control (hang-up / leave button). Search is bounded by
+        `max_elements` visited elements so one check stays fast
+        """
+
+        for handler in window_handlers:
+            pending = deque([self.iui_automation.ElementFromHandle(handler)])
+            visited = 0
+            while pending and visited < max_elements:
+                element = pending.popleft()
+                visited += 1
+                name = element.CurrentName or ""
+                if name.startswith(search_pattern.in_call_control_names):
+                    return element
+                child = walker.GetFirstChildElement(element)
+                while child:
+                    pending.append(child)
+                    child = walker.GetNextSiblingElement(child)
+        return None
+
 
 class MouseEvents:
     """Invoke mouse events
@@ -542,14 +1566,14 @@ class MouseEvents:
         self.user32 = ctypes.windll.LoadLibrary("User32.dll")
 
     @classmethod
-    def left_button_click(cls, dx: int, dy: int):
-        """Simulate mouse left button click on provided position"""
+    def left_button_click(cls, dx: int, dy: int, hold: float = 0.5, settle: float = 0.5):
+        """Simulate mouse left button click on provided position. Button is released after `hold` seconds"""
 
         win32api.SetCursorPos((dx, dy))
         win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
-        time.sleep(0.5)
+        clock.sleep(hold)
         win32api.mouse_event(win32con.MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
-        time.sleep(0.5)
+        clock.sleep(settle)
 
     def block_input(self):
         """Blocks keyboard and mouse input events from reaching applications"""
@@ -563,6 +1587,30 @@ class MouseEvents:
 
 
 class TeamsRunner:
+    # Join press is split into short hold so that button release (actual click) lands on target time
+    join_click_hold = 0.05
+    # Last part of the wait before Join press is spun instead of slept to avoid scheduler oversleep
+    spin_window = 0.02
+    # Joins still make sense shortly after meeting start. Retries stop after that
+    late_join_grace = 120
+    # Teams window usually appears within few seconds after URL is opened. Poll instead of fixed sleep
+    window_policy = RetryPolicy(name="window_detection", attempts=60, base_delay=0.2, max_delay=1.0, budget=30)
+    discovery_policy = RetryPolicy(name="uia_discovery", attempts=8, base_delay=0.25, max_delay=2.0,
+                                   retry_on=(comtypes.COMError,))
+    # In-call UI normally appears within few seconds after Join press
+    verify_policy = RetryPolicy(name="join_verification", attempts=50, base_delay=0.1, max_delay=0.5, budget=10,
+                                retry_on=(comtypes.COMError,))
+    rejoin_attempts = 2
+    # Back-to-back hand-off: previous call is left this many seconds before next Join press until measured hand-offs
+    # give an estimate (CalendarSource.handoff_lead)
+    handoff_lead = 10
+    leave_policy = RetryPolicy(name="leave_call", attempts=20, base_delay=0.1, max_delay=0.5, budget=5,
+                               predicate=lambda control: control is None, retry_on=(comtypes.COMError,))
+    # Upper budgets of mandatory stages, seconds. Overruns are recorded as stage.<name>.overrun metrics
+    stage_budgets = dict(window=30, controls=20, preferences=5, rediscovery=1, handoff=10)
+    # Expected duration of optional work. It is skipped when it does not fit before Join press
+    av_discovery_cost = 2.0
+    toggle_click_cost = 1.0
 
     def __init__(self):
         pass
@@ -585,43 +1633,32 @@ class TeamsRunner:
         return True
 
     @staticmethod
-    def main(meeting: Tuple[float, str, SearchPattern, Any], enum: EnumActiveWindows, iui_auto: Callable,
-             outlook: OutlookApi, mouse: MouseEvents) -> Tuple[bool, Tuple]:
-        """This would be refactored"""
-        # Tuple[time_to_start, URL, SearchPattern, DataStorage(with all attributes)]
+    def wait_until(target: float, spin_window: float = 0.02):
+        """Wait until wall clock `target` timestamp. Sleep coarsely, then spin the last `spin_window` seconds"""
 
-        waiting_for_meeting = outlook.wait_for_meeting(meeting_data=meeting)
-        if not waiting_for_meeting:
-            return False, meeting
+        remaining = target - clock.time()
+        if remaining > spin_window:
+            clock.sleep(remaining - spin_window)
+        while clock.time() < target:
+            clock.sleep(0)
 
-        time_to_start, url, search_pattern, meet_obj = meeting
-
-        # Enumerate active windows. Wait few seconds until window will appear on screen
-        time.sleep(3)
-        enumerated = enum.enumerate_windows
-        teams_window = enum.validate_teams_open_window(enumerated, search_pattern)
-        if not teams_window:
-            warnings.warn(f"{EnumActiveWindows.__name__} did not enumerate Teams window")
-            return False, meeting
-
-        # Activate window. Set window as foreground window.
-        teams_window_hwnd = teams_window[-1]
-        enum.activate_window(teams_window_hwnd)
-
-        # =========== IUIAutomation block. IUIAutomation need to be initialized for each thread.
-        # Iterate over Teams Window. Get ControlTypes. ===========
-        iui_auto = iui_auto()
+    @classmethod
+    def discover_controls(cls, iui_auto: IUIAutomation, teams_window: List[int], search_pattern: SearchPattern,
+                          join_deadline: Optional[JoinDeadline] = None, window_elements: Optional[List] = None) -> bool:
+        """Walk Teams window UIA tree and assign join button, microphone and camera controls to iui_auto.
+        Microphone and camera are optional: they are not searched when no toggle is needed or `join_deadline` is
+        too close. Known `window_elements` skip the walk over desktop children
+        """
 
-        from_root_element = iui_auto.child_siblings_from_root_element(iui_auto.raw_view_walker, iui_auto.root_element,
-                                                                      enum_wind=teams_window,
-                                                                      search_pattern=search_pattern)
+        from_root_element = window_elements or iui_auto.child_siblings_from_root_element(
+            iui_auto.raw_view_walker, iui_auto.root_element, enum_wind=teams_window, search_pattern=search_pattern)
         get_document_control_list = [element for element in
                                      map(iui_auto.raw_view_walker.GetFirstChildElement, from_root_element) if
                                      element.CurrentControlType == ControlType.DocumentControlType]
 
         if not get_document_control_list:
             warnings.warn("Document ControlType was not found!")
-            return False, meeting
+            return False
 
         # Get Pane ControlTypes and get join button
         document_control, *_ = get_document_control_list
@@ -633,7 +1670,19 @@ class TeamsRunner:
         # first item is Pane (with toolbar Controltype) second Pane(with all other Control types: Audio, volume...)
         if not get_controls_50033_list or len(get_controls_50033_list) < 2:
             warnings.warn(f"Pane ControlType was not found or length is < 2 : {len(get_controls_50033_list)} ")
-            return False, meeting
+            return False
+
+        if not iui_auto.join_button:
+            warnings.warn("Join button was not found")
+            return False
+
+        # Join button name carries current microphone and camera states
+        toggles = iui_auto.change_camera_state + iui_auto.change_mic_state
+        if not toggles:
+            return True
+        if join_deadline is not None and not join_deadline.allows(
+                "av_discovery", cls.av_discovery_cost + toggles * cls.toggle_click_cost):
+            return True
 
         # Get microphone Controls
         iui_auto.get_microphone_control_type(iui_auto.control_view_walker, get_controls_50033_list, search_pattern)
@@ -642,50 +1691,583 @@ class TeamsRunner:
         tool_bar = iui_auto.get_toolbar_control_type(iui_auto.raw_view_walker, get_controls_50033_list, search_pattern)
         if not tool_bar:
             warnings.warn(f"ToolBar ControlType was not found")
-            return False, meeting
+            return False
 
         iui_auto.get_camera_control_type(iui_auto.control_view_walker, tool_bar, search_pattern)
 
         # Verify ControlTypes: camera, microphone, join button are parsed
-        if not TeamsRunner.validate_mic_camera_join_controls(mic=iui_auto.microphone_control,
-                                                             cam=iui_auto.camera_control,
-                                                             jbutton=iui_auto.join_button):
-            return False, meeting
+        return cls.validate_mic_camera_join_controls(mic=iui_auto.microphone_control,
+                                                     cam=iui_auto.camera_control,
+                                                     jbutton=iui_auto.join_button)
+
+    @staticmethod
+    def join_button_alive(iui_auto: IUIAutomation, search_pattern: SearchPattern) -> bool:
+        """Re-check cached join button. Element must still be readable, named Join and have non-empty rectangle"""
+
+        try:
+            rectangle = iui_auto.join_button.CurrentBoundingRectangle
+            name = iui_auto.join_button.CurrentName
+        except (AttributeError, comtypes.COMError):
+            return False
+        return search_pattern.join_button_patt in name and rectangle.right > rectangle.left
+
+    @classmethod
+    def apply_preferences(cls, iui_auto: IUIAutomation, mouse: MouseEvents, deadline: JoinDeadline):
+        """Toggle camera and microphone to preferred state if Join press is not near"""
+
+        # Microphone, camera coordinates of toggles still needed. Controls are absent when discovery was skipped
+        toggles = list()
+        if iui_auto.camera_control and iui_auto.change_camera_state:
+            toggles.append(iui_auto.get_camera_x_y)
+        if iui_auto.microphone_control and iui_auto.change_mic_state:
+            toggles.append(iui_auto.get_mic_x_y)
+
+        # Block and then unblock mouse, keyboard inputs
+        if toggles and deadline.allows("preferences", len(toggles) * cls.toggle_click_cost):
+            with deadline.stage("preferences", cls.stage_budgets["preferences"]):
+                mouse.block_input()
+                try:
+                    for toggle in toggles:
+                        mouse.left_button_click(*toggle)
+                finally:
+                    mouse.unblock_input()
+
+    @classmethod
+    def warm_up(cls, meeting: Tuple[float, str, SearchPattern, Any], enum: EnumActiveWindows, iui_auto: Callable,
+                outlook: CalendarSource, mouse: MouseEvents, matcher: Optional[WindowTitleMatcher] = None,
+                join_before: float = 0, deadline: Optional[JoinDeadline] = None,
+                timings: Optional[dict] = None) -> Optional[DataStorage]:
+        """Warm-up phase: open meeting URL, find Teams window and controls, apply microphone and camera preferences.
+        Stages run within `deadline` budgets, microphone and camera work is skipped when Join press is near.
+        Returns prepared join state for commit phase. Stage timestamps are written to `timings`, also on failure.
+        """
+        # Tuple[time_to_start, URL, SearchPattern, DataStorage(with all attributes)]
+
+        time_to_start, url, search_pattern, meet_obj = meeting
+        if deadline is None:
+            deadline = JoinDeadline(target=meet_obj.StartTimestamp - join_before,
+                                    hard=meet_obj.StartTimestamp + cls.late_join_grace)
+        if not outlook.wait_for_lead_time(meeting_data=meeting, join_before=join_before, deadline=deadline):
+            return None
+
+        timings = dict() if timings is None else timings
+        timings["url_open"] = clock.perf_counter()
+        with deadline.stage("window", cls.stage_budgets["window"]):
+            if not outlook.open_meeting_url(url):
+                return None
+
+            # Enumerate active windows until Teams window appears on screen
+            teams_window = cls.window_policy.run(enum.find_teams_window, search_pattern, matcher)
+            if not teams_window:
+                warnings.warn(f"{EnumActiveWindows.__name__} did not enumerate Teams window")
+                return None
+
+            # Activate window. Set window as foreground window.
+            teams_window_hwnd = teams_window[-1]
+            enum.activate_window(teams_window_hwnd)
+        timings["window"] = clock.perf_counter()
+
+        # =========== IUIAutomation block. IUIAutomation need to be initialized for each thread.
+        # Iterate over Teams Window. Get ControlTypes. ===========
+        iui_auto = iui_auto()
+        with deadline.stage("controls", cls.stage_budgets["controls"]):
+            try:
+                discovered = cls.discovery_policy.run(cls.discover_controls, iui_auto, teams_window, search_pattern,
+                                                      join_deadline=deadline)
+            except comtypes.COMError as error:
+                warnings.warn(f"UIA discovery failed: {error}")
+                return None
+            if not discovered:
+                return None
+        timings["controls"] = clock.perf_counter()
+
+        cls.apply_preferences(iui_auto, mouse, deadline)
+        timings["preferences"] = clock.perf_counter()
+
+        prepared = DataStorage()
+        setattr(prepared, "iui_auto", iui_auto)
+        setattr(prepared, "teams_window", teams_window)
+        setattr(prepared, "window_elements", None)
+        setattr(prepared, "search_pattern", search_pattern)
+        setattr(prepared, "timings", timings)
+        setattr(prepared, "handoff", False)
+        return prepared
+
+    @classmethod
+    def leave_call(cls, prepared: DataStorage, enum: EnumActiveWindows, mouse: MouseEvents) -> bool:
+        """Press Leave in the call of `prepared` join and wait until in-call UI is gone"""
+
+        iui_auto = prepared.iui_auto
+        walker = iui_auto.control_view_walker
+        try:
+            leave = iui_auto.in_call_control(walker, prepared.teams_window, prepared.search_pattern)
+            if leave is None:
+                # Call already ended (organizer ended meeting or everybody left)
+                return True
+            enum.activate_window(prepared.teams_window[-1])
+            mouse.block_input()
+            try:
+                mouse.left_button_click(*iui_auto.center_x_y(leave), hold=cls.join_click_hold, settle=0)
+            finally:
+                mouse.unblock_input()
+            return cls.leave_policy.run(iui_auto.in_call_control, walker, prepared.teams_window,
+                                        prepared.search_pattern) is None
+        except comtypes.COMError:
+            # Call window closed together with the call
+            return True
 
-        # Microphone, camera, join button coordinates
-        camera = iui_auto.get_camera_x_y
-        mic = iui_auto.get_mic_x_y
+    @classmethod
+    def hand_off(cls, previous: DataStorage, meeting: Tuple[float, str, SearchPattern, Any], enum: EnumActiveWindows,
+                 outlook: CalendarSource, mouse: MouseEvents, deadline: JoinDeadline,
+                 matcher: Optional[WindowTitleMatcher] = None) -> Optional[DataStorage]:
+        """Back-to-back hand-off: stay in previous call until hand-off lead time before next Join press (calls
+        running over scheduled end are common), leave it, open next URL in the same Teams client and re-resolve only
+        the controls which changed. IUIAutomation object, Teams window (when it is reused) and its element are kept.
+        Returns prepared join state for commit phase or None, then caller falls back to cold warm-up.
+        """
+
+        _, url, search_pattern, meet_obj = meeting
+        if not url:
+            return None
+        leave_at = deadline.target - outlook.handoff_lead(cls.handoff_lead)
+        print(f"Hand-off to meeting which starts at: {meet_obj.Start} >>> Subject: {meet_obj.Subject} "
+              f">>> Leaving previous call in {max(0.0, leave_at - clock.time()):.0f} s")
+        cls.wait_until(leave_at, cls.spin_window)
+
+        iui_auto = previous.iui_auto
+        with deadline.stage("handoff", cls.stage_budgets["handoff"]):
+            timings = dict(left=clock.perf_counter())
+            if not cls.leave_call(previous, enum=enum, mouse=mouse):
+                warnings.warn("Previous call was not left. Falling back to cold join")
+                return None
+            timings["url_open"] = clock.perf_counter()
+            if not outlook.open_meeting_url(url):
+                return None
+
+            # Teams usually re-titles the same window. Enumerate windows only when it did not
+            teams_window = previous.teams_window
+            window_elements = None
+            if search_pattern.subject_name and search_pattern.subject_name in enum.window_title(teams_window[-1]):
+                window_elements = previous.window_elements
+            else:
+                teams_window = cls.window_policy.run(enum.find_teams_window, search_pattern, matcher)
+                if not teams_window:
+                    warnings.warn(f"{EnumActiveWindows.__name__} did not enumerate Teams window")
+                    return None
+            enum.activate_window(teams_window[-1])
+            timings["window"] = clock.perf_counter()
+
+            # Join button and lobby toggles are new elements. Window element is reused
+            iui_auto.join_button = iui_auto.microphone_control = iui_auto.camera_control = None
+            try:
+                if window_elements is None:
+                    window_elements = iui_auto.window_elements(teams_window)
+                discovered = cls.discovery_policy.run(cls.discover_controls, iui_auto, teams_window, search_pattern,
+                                                      join_deadline=deadline, window_elements=window_elements)
+            except comtypes.COMError as error:
+                warnings.warn(f"UIA discovery failed: {error}")
+                return None
+            if not discovered:
+                return None
+            timings["controls"] = clock.perf_counter()
+
+        cls.apply_preferences(iui_auto, mouse, deadline)
+        timings["preferences"] = clock.perf_counter()
+
+        prepared = DataStorage()
+        setattr(prepared, "iui_auto", iui_auto)
+        setattr(prepared, "teams_window", teams_window)
+        setattr(prepared, "window_elements", window_elements)
+        setattr(prepared, "search_pattern", search_pattern)
+        setattr(prepared, "timings", timings)
+        setattr(prepared, "handoff", True)
+        return prepared
+
+    @classmethod
+    def commit(cls, prepared: DataStorage, enum: EnumActiveWindows, mouse: MouseEvents, target: float) -> bool:
+        """Commit phase: press Join button exactly at `target` wall clock timestamp"""
+
+        iui_auto = prepared.iui_auto
+        search_pattern = prepared.search_pattern
+
+        # Re-check cached controls shortly before target so that a possible rediscovery does not delay the press
+        cls.wait_until(target - 1.0, cls.spin_window)
+        if not cls.join_button_alive(iui_auto, search_pattern):
+            warnings.warn("Cached Join button is stale. Discovering controls again")
+            # Only Join button is needed now. Microphone and camera do not fit before target
+            deadline = JoinDeadline(target=target)
+            with deadline.stage("rediscovery", cls.stage_budgets["rediscovery"]):
+                try:
+                    if not cls.discovery_policy.run(cls.discover_controls, iui_auto, prepared.teams_window,
+                                                    search_pattern, join_deadline=deadline):
+                        return False
+                except comtypes.COMError as error:
+                    warnings.warn(f"UIA discovery failed: {error}")
+                    return False
+        enum.activate_window(prepared.teams_window[-1])
         join_button = iui_auto.get_join_x_y
 
-        # Check if Camera and Microphone should be changed their state. Block and then unblock mouse, keyboard inputs
+        # Press JOIN button:
+        cls.wait_until(target - cls.join_click_hold, cls.spin_window)
+        cancelled = getattr(prepared, "cancelled", None)
+        if cancelled is not None and cancelled():
+            warnings.warn("Join was cancelled before Join press")
+            metrics.increment("join.cancelled")
+            return False
         mouse.block_input()
-        if iui_auto.change_camera_state:
-            mouse.left_button_click(*camera)
-        if iui_auto.change_mic_state:
-            mouse.left_button_click(*mic)
+        try:
+            click_start = clock.perf_counter()
+            mouse.left_button_click(*join_button, hold=cls.join_click_hold, settle=0)
+            prepared.timings["join_click"] = clock.perf_counter() - click_start
+            prepared.timings.setdefault("join_pressed", click_start)
+        finally:
+            mouse.unblock_input()
+        return True
 
-        # Press JOIN button:
-        mouse.left_button_click(*join_button)
-        mouse.unblock_input()
-        return True, meeting
+    @classmethod
+    def verify_joined(cls, prepared: DataStorage) -> bool:
+        """Watch for in-call UI after Join press"""
+
+        iui_auto = prepared.iui_auto
+        try:
+            return bool(cls.verify_policy.run(iui_auto.in_call_control, iui_auto.control_view_walker,
+                                              prepared.teams_window, prepared.search_pattern))
+        except comtypes.COMError as error:
+            warnings.warn(f"In-call verification failed: {error}")
+            return False
+
+    @classmethod
+    def verify_and_rejoin(cls, prepared: DataStorage, enum: EnumActiveWindows, mouse: MouseEvents) -> bool:
+        """Verify call was entered. Otherwise re-run discovery and Join press in already open window"""
+
+        for attempt in range(cls.rejoin_attempts + 1):
+            if attempt:
+                warnings.warn(f"In-call UI was not found. Re-joining, attempt {attempt}")
+                metrics.increment("join.rejoin_attempts")
+                if not cls.commit(prepared, enum=enum, mouse=mouse, target=clock.time()):
+                    continue
+            if cls.verify_joined(prepared):
+                metrics.increment("join.success")
+                metrics.observe("join.time_to_in_call", clock.perf_counter() - prepared.timings["join_pressed"])
+                return True
+        metrics.increment("join.failure")
+        return False
+
+    @staticmethod
+    def join_latency(timings: dict) -> Tuple[float, dict]:
+        """End-to-end join latency without the deliberate wait for target time, with per stage breakdown"""
+
+        stages = dict(window=timings["window"] - timings["url_open"],
+                      controls=timings["controls"] - timings["window"],
+                      preferences=timings["preferences"] - timings["controls"],
+                      join_click=timings["join_click"])
+        if "left" in timings:
+            # Hand-off: leaving previous call is on the critical path too
+            stages["leave"] = timings["url_open"] - timings["left"]
+        return sum(stages.values()), stages
+
+    @staticmethod
+    def main(meeting: Tuple[float, str, SearchPattern, Any], enum: EnumActiveWindows, iui_auto: Callable,
+             outlook: CalendarSource, mouse: MouseEvents, join_before: float = 0,
+             matcher: Optional[WindowTitleMatcher] = None, previous: Optional[DataStorage] = None,
+             cancelled: Optional[Callable[[], bool]] = None) -> Tuple[bool, Tuple]:
+        """Warm up meeting lobby ahead of time, then press Join `join_before` seconds before meeting start.
+        With join state of `previous` back-to-back meeting its call is handed off instead of cold warm-up.
+        Join state is kept in meeting object as `JoinState` for the next hand-off (`run_chain` takes it over and
+        removes it, so UIA elements of finished meetings are not retained). Join is not pressed once
+        `cancelled()` is true (e.g. coordinator lease was lost)
+        """
+
+        *_, meet_obj = meeting
+        deadline = JoinDeadline(target=meet_obj.StartTimestamp - join_before,
+                                hard=meet_obj.StartTimestamp + TeamsRunner.late_join_grace)
+        with RetryPolicy.deadline_scope(deadline.hard):
+            prepared = None
+            if previous is not None:
+                prepared = TeamsRunner.hand_off(previous, meeting, enum=enum, outlook=outlook, mouse=mouse,
+                                                deadline=deadline, matcher=matcher)
+                metrics.increment("handoff.success" if prepared else "handoff.fallback")
+            timings = dict()
+            if not prepared:
+                prepared = TeamsRunner.warm_up(meeting, enum=enum, iui_auto=iui_auto, outlook=outlook, mouse=mouse,
+                                               matcher=matcher, join_before=join_before, deadline=deadline,
+                                               timings=timings)
+            if not prepared:
+                TeamsRunner.record_failed_join(timings, outlook=outlook, start=meet_obj.StartTimestamp)
+                return False, meeting
+            setattr(prepared, "cancelled", cancelled)
+
+            joined = TeamsRunner.commit(prepared, enum=enum, mouse=mouse,
+                                        target=meet_obj.StartTimestamp - join_before)
+            if joined:
+                joined = TeamsRunner.verify_and_rejoin(prepared, enum=enum, mouse=mouse)
+            else:
+                metrics.increment("join.failure")
+        if joined:
+            setattr(meet_obj, "JoinState", prepared)
+            if prepared.handoff:
+                # Time spent outside of any call between back-to-back meetings
+                metrics.observe("handoff.gap", prepared.timings["join_pressed"] - prepared.timings["left"])
+            if outlook.latency_history is not None:
+                latency, stages = TeamsRunner.join_latency(prepared.timings)
+                outlook.latency_history.record(latency, start=meet_obj.StartTimestamp, stages=stages,
+                                               handoff=prepared.handoff)
+        elif not prepared.handoff and not (cancelled is not None and cancelled()):
+            TeamsRunner.record_failed_join(prepared.timings, outlook=outlook, start=meet_obj.StartTimestamp)
+        return joined, meeting
+
+    @staticmethod
+    def record_failed_join(timings: dict, outlook: CalendarSource, start: float):
+        """Record failed cold join as measured latency when Join was pressed, otherwise as the time spent until it
+        gave up. Joins which failed before URL was opened are not recorded
+        """
+
+        if outlook.latency_history is None or "url_open" not in timings:
+            return
+        if "join_click" in timings:
+            latency, stages = TeamsRunner.join_latency(timings)
+        else:
+            latency, stages = clock.perf_counter() - timings["url_open"], None
+        outlook.latency_history.record(latency, start=start, stages=stages, failed=True)
+
+    @staticmethod
+    def handoff_chains(meetings_data: List[Tuple[float, str, SearchPattern, Any]], handoff_gap: float) -> List[
+            List[Tuple[float, str, SearchPattern, Any]]]:
+        """Group meetings (sorted by start) into back-to-back chains: next meeting starts at most `handoff_gap`
+        seconds after previous one ends. Overlapping meetings are not chained, they are joined in parallel
+        """
+
+        chains = list()
+        open_chains = list()
+        for meeting in meetings_data:
+            *_, meet_obj = meeting
+            start = meet_obj.StartTimestamp
+            # Chains ended long before this start can not be extended by any later meeting either
+            open_chains = [chain for chain in open_chains if chain[-1][3].EndTimestamp >= start - handoff_gap]
+            follows = next((chain for chain in open_chains if chain[-1][3].EndTimestamp <= start), None)
+            if follows is not None:
+                follows.append(meeting)
+                open_chains.remove(follows)
+            else:
+                follows = [meeting]
+                chains.append(follows)
+            if getattr(meet_obj, "EndTimestamp", None) is not None:
+                open_chains.append(follows)
+        return chains
+
+    @classmethod
+    def concurrent_chains(cls, chains: List[List[Tuple[float, str, SearchPattern, Any]]], lead_time: float) -> int:
+        """Most chains in flight at once. Chain occupies its thread from warm-up of first meeting (at most
+        `lead_time` before start) until last meeting is joined or given up
+        """
+
+        events = list()
+        for chain in chains:
+            events.append((chain[0][3].StartTimestamp - lead_time, 1))
+            events.append((chain[-1][3].StartTimestamp + cls.late_join_grace, -1))
+        in_flight = peak = 0
+        # Chain ending at the moment another one starts still holds its thread
+        for _, change in sorted(events, key=lambda event: (event[0], -event[1])):
+            in_flight += change
+            peak = max(peak, in_flight)
+        return peak
+
+    @staticmethod
+    def run_chain(chain: List[Tuple[float, str, SearchPattern, Any]], runner: Callable, **kwargs) -> List[
+            Tuple[bool, Tuple]]:
+        """Join back-to-back meetings one after another in one thread, handing off each joined call to the next"""
+
+        results = list()
+        previous = None
+        for meeting in chain:
+            if previous is not None:
+                joined, meeting = runner(meeting, previous=previous, **kwargs)
+            else:
+                joined, meeting = runner(meeting, **kwargs)
+            results.append((joined, meeting))
+            # Only the previous meeting's join state is kept: it holds UIA elements and COM pointers
+            previous = getattr(meeting[3], "JoinState", None)
+            if previous is not None:
+                delattr(meeting[3], "JoinState")
+            if not joined:
+                previous = None
+        return results
 
     @classmethod
     def run_meetings(cls, meetings_data: List[Tuple[float, str, SearchPattern, Any]], enum: EnumActiveWindows,
-                     iui_auto: Callable, outlook: OutlookApi, mouse: MouseEvents) -> Tuple[bool, List]:
-        """Validate meetings first and then run them."""
+                     iui_auto: Callable, outlook: CalendarSource, mouse: MouseEvents,
+                     join_before: float = 0, runner: Optional[Callable] = None,
+                     handoff_gap: float = 0, supervisor: Optional[TeamsSupervisor] = None) -> Tuple[bool, List]:
+        """Validate meetings first and then run them. With `handoff_gap` back-to-back meetings run as chains,
+        `supervisor` starts Teams ahead of warm-ups
+        """
 
         meetings_results = list()
 
         if not TeamsRunner.validate_meetings(meetings_data):
             return False, meetings_results
 
-        wrapper_main = partial(TeamsRunner.main, enum=enum, iui_auto=iui_auto, outlook=outlook, mouse=mouse)
-
-        with ThreadPoolExecutor() as executor:
-            results = executor.map(wrapper_main, meetings_data)
+        # One matcher per schedule: every waiting meeting is resolved by the same pass over open windows
+        matcher = WindowTitleMatcher.from_meetings(meetings_data)
+        chains = cls.handoff_chains(meetings_data, handoff_gap) if handoff_gap > 0 else [[meeting] for meeting in
+                                                                                          meetings_data]
+        wrapper_chain = partial(cls.run_chain, runner=runner or TeamsRunner.main, enum=enum, iui_auto=iui_auto,
+                                outlook=outlook, mouse=mouse, join_before=join_before, matcher=matcher)
 
-            for mt_result, mt_obj in results:
-                print(f"Meeting organized by: {mt_obj[3].GetOrganizer} "
-                      f"subject: {mt_obj[3].Subject}. Successful: {mt_result}")
-                meetings_results.append((mt_obj[3].GetOrganizer, mt_obj[3].Subject, mt_result))
+        if supervisor is not None:
+            supervisor.start(meetings_data, outlook=outlook, join_before=join_before)
+        try:
+            # Chain holds its thread for the whole chain. Pool fits every chain in flight, so none waits for a thread
+            pool_size = max(1, cls.concurrent_chains(chains, outlook.start_before))
+            with ThreadPoolExecutor(max_workers=pool_size) as executor:
+                for results in executor.map(wrapper_chain, chains):
+                    for mt_result, mt_obj in results:
+                        print(f"Meeting organized by: {mt_obj[3].GetOrganizer} "
+                              f"subject: {mt_obj[3].Subject}. Successful: {mt_result}")
+                        meetings_results.append((mt_obj[3].GetOrganizer, mt_obj[3].Subject, mt_result))
+        finally:
+            if supervisor is not None:
+                supervisor.stop()
         return True, meetings_results
+
+
+class AssignedCalendar(CalendarSource):
+    """Calendar of meetings scheduled elsewhere: join worker process (parent already waited for lead time) or
+    coordinator worker agent. Warm-up starts `time_before` ahead of meeting. Latency records are collected in
+    `records` for the scheduler instead of writing shared history file. Use one instance per join
+    """
+
+    def __init__(self, time_before: int):
+        super().__init__(time_before=time_before)
+        self.latency_history = self
+        self.records = list()
+
+    def lead_time(self, meet_object: DataStorage, join_before: float = 0) -> float:
+        return self.start_before
+
+    def handoff_lead(self, default: float) -> float:
+        return default
+
+    def record(self, latency: float, start: float, stages: Optional[dict] = None, failed: bool = False,
+               handoff: bool = False):
+        self.records.append((latency, start, stages, failed, handoff))
+
+    def read_events(self) -> Optional[List[DataStorage]]:
+        return list()
+
+
+def _join_in_process(connection, meeting_spec: dict, iui_auto: Callable, join_before: float, start_before: int,
+                     worker_setup: Optional[Callable] = None):
+    """Join worker process body. Initializes own COM apartment, runs TeamsRunner.main and sends result to parent.
+    `worker_setup` (e.g. profiler setup) runs first, `stop` of its result runs at exit
+    """
+
+    pythoncom.CoInitialize()
+    mouse = MouseEvents()
+    worker_state = worker_setup() if worker_setup is not None else None
+    try:
+        calendar = AssignedCalendar(time_before=start_before)
+        search_pattern = SearchPattern()
+        search_pattern.add_name(meeting_spec["Subject"])
+        meet_object = DataStorage()
+        for name, value in meeting_spec.items():
+            setattr(meet_object, name, value)
+        meeting = (meeting_spec["StartTimestamp"] - clock.time(), meeting_spec["url"], search_pattern, meet_object)
+        joined, _ = TeamsRunner.main(meeting, enum=EnumActiveWindows(), iui_auto=iui_auto, outlook=calendar,
+                                     mouse=mouse, join_before=join_before)
+        connection.send((joined, calendar.records, metrics.export(), None))
+    except Exception as error:
+        connection.send((False, list(), metrics.export(), repr(error)))
+    finally:
+        # BlockInput is released only by the thread which blocked it (or when that thread dies)
+        mouse.unblock_input()
+        connection.close()
+        if worker_state is not None:
+            worker_state.stop()
+        pythoncom.CoUninitialize()
+
+
+class ProcessJoinRunner:
+    """Run every join in separate worker process.
+
+    A hung UIA or COM call only stalls its own process. Parent waits for meeting lead time itself, starts worker
+    process (own COM initialization), enforces hard timeout and kills stuck worker. Input blocked by a killed worker
+    is released by Windows together with its thread. Worker metrics are merged into parent `metrics`.
+    Drop-in replacement for TeamsRunner.main in TeamsRunner.run_meetings(runner=...).
+    """
+
+    # Worker may run lead time + late join grace + verification. Anything beyond that is a hung worker
+    hard_timeout_margin = 60
+
+    def __init__(self, hard_timeout_margin: Optional[float] = None, worker_setup: Optional[Callable] = None):
+        if hard_timeout_margin is not None:
+            self.hard_timeout_margin = hard_timeout_margin
+        # Picklable callable run first in every worker process, e.g. profiler setup
+        self.worker_setup = worker_setup
+        self.context = multiprocessing.get_context("spawn")
+
+    @staticmethod
+    def _meeting_spec(meeting: Tuple[float, str, SearchPattern, Any]) -> dict:
+        """Picklable part of meeting data"""
+
+        _, url, _, meet_object = meeting
+        return dict(url=url, Subject=meet_object.Subject, Start=str(meet_object.Start),
+                    StartTimestamp=meet_object.StartTimestamp, GetOrganizer=meet_object.GetOrganizer,
+                    Location=meet_object.Location)
+
+    def main(self, meeting: Tuple[float, str, SearchPattern, Any], enum: EnumActiveWindows, iui_auto: Callable,
+             outlook: CalendarSource, mouse: MouseEvents, join_before: float = 0,
+             matcher: Optional[WindowTitleMatcher] = None) -> Tuple[bool, Tuple]:
+        """Wait for lead time, then join meeting in worker process"""
+
+        if not outlook.wait_for_lead_time(meeting_data=meeting, join_before=join_before):
+            return False, meeting
+
+        *_, meet_object = meeting
+        lead_time = max(0.0, meet_object.StartTimestamp - clock.time())
+        hard_timeout = lead_time + TeamsRunner.late_join_grace + self.hard_timeout_margin
+        receiver, sender = self.context.Pipe(duplex=False)
+        worker = self.context.Process(target=_join_in_process, name=f"join-{meet_object.Subject}",
+                                      args=(sender, self._meeting_spec(meeting), iui_auto, join_before,
+                                            int(lead_time) + 1, self.worker_setup),
+                                      daemon=True)
+        worker.start()
+        worker_started = clock.time()
+        sender.close()
+        joined = False
+        records = list()
+        abandoned = False
+        try:
+            if receiver.poll(hard_timeout):
+                joined, records, worker_metrics, error = receiver.recv()
+                metrics.merge(worker_metrics)
+                if outlook.latency_history is not None:
+                    for latency, start, stages, failed, handoff in records:
+                        outlook.latency_history.record(latency, start=start, stages=stages, failed=failed,
+                                                       handoff=handoff)
+                if error is not None:
+                    abandoned = True
+                    warnings.warn(f"Join worker of {meet_object.Subject!r} failed: {error}")
+            else:
+                abandoned = True
+                warnings.warn(f"Join worker of {meet_object.Subject!r} exceeded {hard_timeout:.0f} s. Killing it")
+                metrics.increment("join.worker_killed")
+                worker.kill()
+        except (EOFError, OSError) as error:
+            abandoned = True
+            warnings.warn(f"Join worker of {meet_object.Subject!r} died: {error!r}")
+            metrics.increment("join.worker_died")
+        finally:
+            receiver.close()
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.kill()
+                worker.join()
+        if abandoned and not records and outlook.latency_history is not None:
+            # Killed or crashed worker: join took at least until it was given up, at most until join hard deadline
+            outlook.latency_history.record(min(clock.time() - worker_started, lead_time + TeamsRunner.late_join_grace),
+                                           start=meet_object.StartTimestamp, failed=True)
+        if abandoned:
+            # Join outcome of a finished worker is already counted in merged worker metrics
+            metrics.increment("join.failure")
+        return joined, meeting
@@ -0,0 +1,137 @@
+"""Clocks used by timing logic.
+
+`SystemClock` is the real clock. `VirtualClock` is a discrete event clock for simulations: `sleep` blocks until
+virtual time reaches the wake-up time, and virtual time jumps straight to the earliest pending wake-up once every
+participant thread sleeps. A simulated day of waiting passes in the real time needed to run the code between
+sleeps. No Windows dependencies.
+"""
+from __future__ import annotations
+
+import datetime
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Optional, Tuple
+
+
+class SystemClock:
+    """Real wall clock"""
+
+    @staticmethod
+    def time() -> float:
+        return time.time()
+
+    @staticmethod
+    def monotonic() -> float:
+        return time.monotonic()
+
+    @staticmethod
+    def perf_counter() -> float:
+        return time.perf_counter()
+
+    @staticmethod
+    def sleep(seconds: float):
+        time.sleep(seconds)
+
+    @staticmethod
+    def now() -> datetime.datetime:
+        return datetime.datetime.now()
+
+    @contextmanager
+    def participant(self):
+        """Mark current thread as running simulated work. No-op for real clock"""
+
+        yield
+
+
+class VirtualClock(SystemClock):
+    """Discrete event clock.
+
+    Virtual time moves only in `sleep`: when no participant thread is running, no woken thread has resumed yet and
+    no thread touched the clock for `settle` real seconds, time jumps to the earliest wake-up. Threads which run
+    simulated work are marked with `participant()`, so time never moves under them. Zero sleeps (spin loops) last
+    `resolution` virtual seconds. `time`, `monotonic` and `perf_counter` all return virtual timestamp.
+    """
+
+    def __init__(self, start: Optional[float] = None, resolution: float = 0.001, settle: float = 0.0005):
+        self.resolution = resolution
+        self.settle = settle
+        self.advances = 0
+        self._now = time.time() if start is None else start
+        self._wakeups: List[Tuple[float, int, threading.Event]] = list()
+        self._sequence = itertools.count()
+        self._busy = 0
+        self._waking = 0
+        self._activity = 0
+        self._closed = False
+        self._local = threading.local()
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._advance_loop, name="VirtualClock", daemon=True)
+        self._thread.start()
+
+    def time(self) -> float:
+        with self._condition:
+            self._activity += 1
+            return self._now
+
+    monotonic = time
+    perf_counter = time
+
+    def now(self) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(self.time())
+
+    def sleep(self, seconds: float):
+        participant = getattr(self._local, "participant", 0)
+        woken = threading.Event()
+        with self._condition:
+            self._activity += 1
+            heapq.heappush(self._wakeups, (self._now + max(seconds, self.resolution), next(self._sequence), woken))
+            self._busy -= participant
+            self._condition.notify()
+        # Each sleeper waits on own event, so an advance wakes only threads which are due
+        woken.wait()
+        with self._condition:
+            self._waking -= 1
+            self._busy += participant
+            self._activity += 1
+
+    @contextmanager
+    def participant(self):
+        """Keep virtual time still while current thread runs outside of `sleep`"""
+
+        self._local.participant = getattr(self._local, "participant", 0) + 1
+        with self._condition:
+            self._busy += 1
+        try:
+            yield
+        finally:
+            self._local.participant -= 1
+            with self._condition:
+                self._busy -= 1
+                self._condition.notify()
+
+    def _advance_loop(self):
+        """Advancer thread body"""
+
+        with self._condition:
+            while not self._closed:
+                activity = self._activity
+                self._condition.wait(self.settle)
+                if self._busy or self._waking or not self._wakeups or activity != self._activity:
+                    continue
+                self._now = max(self._now, self._wakeups[0][0])
+                while self._wakeups and self._wakeups[0][0] <= self._now:
+                    *_, woken = heapq.heappop(self._wakeups)
+                    self._waking += 1
+                    woken.set()
+                self.advances += 1
+
+    def close(self):
+        """Stop advancer thread. Threads still sleeping stay blocked"""
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
@@ -0,0 +1,654 @@
+"""Coordinator mode. One coordinator process owns the merged meeting schedule and hands meetings out to worker
+agents (meeting-room / recording PCs) over a line delimited JSON socket protocol.
+
+Worker -> coordinator messages, each answered with exactly one reply line:
+    {"type": "hello", "worker": id, "capacity": n}              -> {"type": "welcome", "heartbeat": s, "lease": s}
+    {"type": "calendar", "worker": id, "meetings": [{...}, ...]} -> {"type": "ack", "merged": n}
+    {"type": "heartbeat", "worker": id, "held": [key, ...]}     -> {"type": "ack", "revoked": [key, ...]}
+    {"type": "request", "worker": id}
+        -> {"type": "assign", "meeting": {...}, "lease": s} | {"type": "idle"} | {"type": "finished"}
+    {"type": "result", "worker": id, "key": key, "success": b}  -> {"type": "ack"}
+
+Schedule is merged from coordinator calendar and calendars contributed by workers. Every assignment is a lease.
+Heartbeats renew leases of held meetings. When a worker stops heart-beating its leases expire and meetings go back to
+the pending queue, so another worker picks them up. A meeting has at most one active lease at a time. Worker side lease
+(`LeaseToken`) expires no later than coordinator side one and Join is never pressed on an expired or revoked lease,
+so a former holder does not join a reassigned meeting after losing its lease. A holder which pressed Join just
+before its lease was lost can still overlap with the next holder.
+Meetings are only handed to a worker whose active load is not above the least loaded live worker, which spreads load
+across machines.
+
+Fake backends (`--backend fake`, `--fake_meetings`) run the whole setup on one Linux host:
+    python coordinator.py coordinator --address 127.0.0.1:8765 --fake_meetings 20
+    python coordinator.py worker --address 127.0.0.1:8765 --backend fake --worker_id box-1
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import json
+import random
+import socket
+import socketserver
+import threading
+import time
+import uuid
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from functools import partial
+from typing import Callable, Dict, List, Optional
+
+from meeting_index import MeetingIndex, meeting_identifiers
+
+
+@dataclass()
+class Meeting:
+    """Meeting as it travels over the wire"""
+
+    key: str
+    subject: str
+    url: str
+    start: float
+    organizer: str = ""
+    location: str = ""
+    appointment_id: str = ""
+
+
+@dataclass()
+class Assignment:
+    """Coordinator side state of one meeting"""
+
+    meeting: Meeting
+    state: str = "pending"
+    worker: Optional[str] = None
+    lease_expires: float = 0.0
+    attempts: int = 0
+    failed_on: List[str] = field(default_factory=list)
+    holders: List[str] = field(default_factory=list)
+
+
+@dataclass()
+class WorkerState:
+    """Coordinator side state of one worker agent"""
+
+    worker: str
+    capacity: int
+    last_seen: float
+    held: set = field(default_factory=set)
+
+
+class Coordinator:
+    """Owns merged schedule, leases meetings to workers and reassigns them on worker failure"""
+
+    def __init__(self, dispatch_ahead: float = 300.0, lease: float = 15.0, heartbeat: float = 3.0,
+                 late_join_grace: float = 120.0, max_attempts: int = 3, clock: Callable[[], float] = time.time,
+                 duplicate_tolerance: float = 300.0, min_calendars: int = 0):
+        self.dispatch_ahead = dispatch_ahead
+        self.lease = lease
+        self.heartbeat = heartbeat
+        self.late_join_grace = late_join_grace
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.assignments: Dict[str, Assignment] = dict()
+        self.workers: Dict[str, WorkerState] = dict()
+        # Schedule is not finished before this many workers contributed their calendars
+        self.min_calendars = min_calendars
+        self.calendars: set = set()
+        # Same meeting merged from different calendars arrives under different keys. It is scheduled once
+        self.index = MeetingIndex(tolerance=duplicate_tolerance)
+        self._lock = threading.Lock()
+
+    def merge(self, meetings: List[Meeting]) -> int:
+        """Merge meetings from one calendar source. Meetings with known key are updated, copies of already scheduled
+        meeting (same join thread id or appointment id, close start) are dropped
+        """
+
+        with self._lock:
+            return self._merge(meetings)
+
+    def _merge(self, meetings: List[Meeting]) -> int:
+        merged = 0
+        for meeting in meetings:
+            assignment = self.assignments.get(meeting.key)
+            if assignment is None:
+                _, new = self.index.add(meeting_identifiers(meeting.url, meeting.appointment_id), meeting.start,
+                                        meeting.key)
+                if new:
+                    self.assignments[meeting.key] = Assignment(meeting=meeting)
+                    merged += 1
+            elif assignment.state == "pending":
+                assignment.meeting = meeting
+        return merged
+
+    def _live_workers(self, now: float) -> List[WorkerState]:
+        return [state for state in self.workers.values() if now - state.last_seen <= self.lease]
+
+    def _release(self, assignment: Assignment, now: float, failed: bool = False):
+        """Put leased meeting back to pending queue or give it up when it can not be joined anymore"""
+
+        worker = self.workers.get(assignment.worker)
+        if worker:
+            worker.held.discard(assignment.meeting.key)
+        if failed and assignment.worker:
+            assignment.failed_on.append(assignment.worker)
+        assignment.worker = None
+        too_late = now > assignment.meeting.start + self.late_join_grace
+        assignment.state = "failed" if too_late or assignment.attempts >= self.max_attempts else "pending"
+
+    def reap(self):
+        """Expire leases of silent workers"""
+
+        now = self.clock()
+        with self._lock:
+            for assignment in self.assignments.values():
+                if assignment.state == "leased" and assignment.lease_expires < now:
+                    warnings.warn(f"Lease of {assignment.meeting.subject!r} held by {assignment.worker} expired")
+                    self._release(assignment, now)
+                elif assignment.state == "pending" and now > assignment.meeting.start + self.late_join_grace:
+                    assignment.state = "failed"
+            for worker in [state.worker for state in self.workers.values() if now - state.last_seen > 2 * self.lease]:
+                del self.workers[worker]
+
+    def _assign(self, worker: WorkerState, now: float) -> Optional[Assignment]:
+        """Pick earliest due pending meeting for worker, respecting capacity and load spreading"""
+
+        if len(worker.held) >= worker.capacity:
+            return None
+        least_loaded = min(len(state.held) for state in self._live_workers(now) or [worker])
+        if len(worker.held) > least_loaded:
+            return None
+        due = [assignment for assignment in self.assignments.values() if assignment.state == "pending" and
+               assignment.meeting.start - self.dispatch_ahead <= now]
+        # Prefer workers which have not failed this meeting yet
+        due.sort(key=lambda assignment: (worker.worker in assignment.failed_on, assignment.meeting.start))
+        if not due:
+            return None
+        assignment = due[0]
+        assignment.state = "leased"
+        assignment.worker = worker.worker
+        assignment.lease_expires = now + self.lease
+        assignment.attempts += 1
+        assignment.holders.append(worker.worker)
+        worker.held.add(assignment.meeting.key)
+        return assignment
+
+    def handle(self, message: dict) -> dict:
+        """Handle one worker message and return reply"""
+
+        now = self.clock()
+        kind = message.get("type")
+        worker_id = message.get("worker")
+        with self._lock:
+            if kind == "hello":
+                state = self.workers.get(worker_id)
+                if state is None:
+                    self.workers[worker_id] = WorkerState(worker=worker_id, capacity=int(message.get("capacity", 1)),
+                                                          last_seen=now)
+                else:
+                    state.capacity = int(message.get("capacity", state.capacity))
+                    state.last_seen = now
+                return dict(type="welcome", heartbeat=self.heartbeat, lease=self.lease)
+
+            state = self.workers.get(worker_id)
+            if state is None:
+                return dict(type="error", reason="unknown worker, send hello")
+            state.last_seen = now
+
+            if kind == "heartbeat":
+                revoked = list()
+                for key in message.get("held", list()):
+                    assignment = self.assignments.get(key)
+                    if assignment and assignment.state == "leased" and assignment.worker == worker_id:
+                        assignment.lease_expires = now + self.lease
+                    else:
+                        # Lease was reassigned while worker was silent. Worker must drop it
+                        revoked.append(key)
+                return dict(type="ack", revoked=revoked)
+
+            if kind == "calendar":
+                merged = self._merge([Meeting(**meeting) for meeting in message.get("meetings", list())])
+                self.calendars.add(worker_id)
+                return dict(type="ack", merged=merged)
+
+            if kind == "request":
+                assignment = self._assign(state, now)
+                if assignment is None:
+                    return dict(type="finished") if self._finished() else dict(type="idle")
+                return dict(type="assign", meeting=asdict(assignment.meeting), lease=self.lease)
+
+            if kind == "result":
+                assignment = self.assignments.get(message.get("key"))
+                if assignment is None or assignment.state in ("done", "failed"):
+                    return dict(type="ack")
+                if message.get("success") and worker_id in assignment.holders:
+                    # Late success of previous holder wins. Current holder's lease is revoked on its next heartbeat
+                    current = self.workers.get(assignment.worker)
+                    if current:
+                        current.held.discard(assignment.meeting.key)
+                    state.held.discard(assignment.meeting.key)
+                    assignment.state = "done"
+                    assignment.worker = worker_id
+                elif assignment.worker == worker_id and assignment.state == "leased":
+                    self._release(assignment, now, failed=True)
+                return dict(type="ack")
+
+        return dict(type="error", reason=f"unknown message type {kind!r}")
+
+    def summary(self) -> Dict[str, int]:
+        """Count meetings per state"""
+
+        with self._lock:
+            counts = dict()
+            for assignment in self.assignments.values():
+                counts[assignment.state] = counts.get(assignment.state, 0) + 1
+            return counts
+
+    def _finished(self) -> bool:
+        return len(self.calendars) >= self.min_calendars and all(
+            assignment.state in ("done", "failed") for assignment in self.assignments.values())
+
+    def finished(self) -> bool:
+        """True when every meeting is either joined or given up and expected worker calendars arrived"""
+
+        with self._lock:
+            return self._finished()
+
+
+class CoordinatorServer(socketserver.ThreadingTCPServer):
+    """TCP server. One handler thread per worker connection"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, coordinator: Coordinator):
+        self.coordinator = coordinator
+        super().__init__(address, _CoordinatorHandler)
+
+
+class _CoordinatorHandler(socketserver.StreamRequestHandler):
+
+    def handle(self):
+        for line in self.rfile:
+            try:
+                message = json.loads(line)
+                if not isinstance(message, dict):
+                    raise ValueError("message must be JSON object")
+                reply = self.server.coordinator.handle(message)
+            except (ValueError, TypeError) as error:
+                reply = dict(type="error", reason=str(error))
+            self.wfile.write((json.dumps(reply) + "\n").encode())
+
+
+class LeaseToken:
+    """Worker side view of one meeting lease. It expires `lease` seconds after the last renewal request was sent, so
+    never later than coordinator side lease, or when coordinator revokes it. Joiner checks `cancelled` right before
+    Join press: meeting whose lease could not be renewed may already be reassigned to another worker
+    """
+
+    def __init__(self, lease: float, sent_at: float):
+        self.lease = lease
+        self.expires = sent_at + lease
+        self._revoked = threading.Event()
+
+    def renew(self, sent_at: float):
+        if not self._revoked.is_set():
+            self.expires = max(self.expires, sent_at + self.lease)
+
+    def revoke(self):
+        self._revoked.set()
+
+    def cancelled(self) -> bool:
+        return self._revoked.is_set() or time.monotonic() > self.expires
+
+    def wait(self, seconds: float) -> bool:
+        """Sleep up to `seconds`. Return True as soon as lease is cancelled"""
+
+        until = time.monotonic() + seconds
+        while not self.cancelled():
+            now = time.monotonic()
+            if now >= until:
+                return False
+            self._revoked.wait(min(until, self.expires) - now + 0.001)
+        return True
+
+
+class WorkerAgent:
+    """Worker agent. Contributes its `calendar` to the schedule, pulls meetings from coordinator, joins them with
+    `joiner(meeting, lease)` and keeps leases alive. Stops when coordinator reports finished schedule or after
+    `max_reconnects` failed connection attempts in a row
+    """
+
+    def __init__(self, address: tuple, joiner: Callable[[Meeting, LeaseToken], bool], worker_id: Optional[str] = None,
+                 capacity: int = 2, reconnect: float = 2.0, max_reconnects: int = 30,
+                 calendar: Optional[Callable[[], List[Meeting]]] = None, calendar_interval: float = 300.0):
+        self.address = address
+        self.joiner = joiner
+        self.worker_id = worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        self.capacity = capacity
+        self.reconnect = reconnect
+        self.max_reconnects = max_reconnects
+        self.calendar = calendar
+        self.calendar_interval = calendar_interval
+        self.held: Dict[str, LeaseToken] = dict()
+        self.results: List[tuple] = list()
+        self._finished: List[tuple] = list()
+        self._failures = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._executor = ThreadPoolExecutor(max_workers=capacity, thread_name_prefix=f"join-{self.worker_id}")
+
+    def _send(self, connection, reader, message: dict) -> dict:
+        message["worker"] = self.worker_id
+        connection.sendall((json.dumps(message) + "\n").encode())
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Coordinator closed connection")
+        return json.loads(line)
+
+    def _join(self, meeting: Meeting, lease: LeaseToken):
+        try:
+            success = bool(self.joiner(meeting, lease))
+        except Exception as error:
+            warnings.warn(f"Join of {meeting.subject!r} failed: {error!r}")
+            success = False
+        with self._lock:
+            self._finished.append((meeting.key, success))
+            self.results.append((meeting.subject, success))
+
+    def _send_calendar(self, connection, reader):
+        try:
+            meetings = self.calendar()
+        except Exception as error:
+            warnings.warn(f"Worker {self.worker_id} calendar was not read: {error!r}")
+            return
+        self._send(connection, reader, dict(type="calendar", meetings=[asdict(meeting) for meeting in meetings]))
+
+    def _session(self, heartbeat_override: Optional[float] = None):
+        """One connection lifetime. Raises ConnectionError/OSError when coordinator is lost"""
+
+        with socket.create_connection(self.address, timeout=10.0) as connection:
+            reader = connection.makefile("r")
+            welcome = self._send(connection, reader, dict(type="hello", capacity=self.capacity))
+            self._failures = 0
+            interval = heartbeat_override or welcome["heartbeat"]
+            # Reply which does not come within a lease means lost coordinator
+            connection.settimeout(welcome["lease"])
+            next_calendar = time.monotonic()
+            while not self._stop.is_set():
+                if self.calendar is not None and time.monotonic() >= next_calendar:
+                    self._send_calendar(connection, reader)
+                    next_calendar = time.monotonic() + self.calendar_interval
+
+                with self._lock:
+                    finished, self._finished = self._finished, list()
+                for key, success in finished:
+                    self._send(connection, reader, dict(type="result", key=key, success=success))
+                    self.held.pop(key, None)
+
+                sent_at = time.monotonic()
+                reply = self._send(connection, reader, dict(type="heartbeat", held=list(self.held)))
+                revoked = set(reply.get("revoked", list()))
+                for key, lease in list(self.held.items()):
+                    if key in revoked:
+                        # Coordinator handed meeting to somebody else. Join must not be pressed here
+                        lease.revoke()
+                        self.held.pop(key)
+                    else:
+                        lease.renew(sent_at)
+
+                while len(self.held) < self.capacity:
+                    sent_at = time.monotonic()
+                    reply = self._send(connection, reader, dict(type="request"))
+                    if reply.get("type") == "finished":
+                        self._stop.set()
+                        return
+                    if reply.get("type") != "assign":
+                        break
+                    meeting = Meeting(**reply["meeting"])
+                    lease = LeaseToken(reply.get("lease", welcome["lease"]), sent_at)
+                    self.held[meeting.key] = lease
+                    self._executor.submit(self._join, meeting, lease)
+                self._stop.wait(interval)
+
+    def run(self, heartbeat_override: Optional[float] = None):
+        """Serve coordinator until stopped or schedule is finished. Reconnect when coordinator is unreachable"""
+
+        while not self._stop.is_set():
+            try:
+                self._session(heartbeat_override)
+            except (OSError, ValueError) as error:
+                self._failures += 1
+                if self._failures >= self.max_reconnects:
+                    warnings.warn(f"Worker {self.worker_id} gave up after {self._failures} failed connections")
+                    break
+                warnings.warn(f"Worker {self.worker_id} lost coordinator: {error}")
+                self._stop.wait(self.reconnect)
+        self.stop()
+
+    def stop(self):
+        self._stop.set()
+        self._executor.shutdown(wait=False)
+
+
+class FakeJoiner:
+    """Fake join backend for Linux runs: waits until meeting start, then succeeds with given probability. Join press
+    is skipped when lease is cancelled. Presses are appended to `log` file as '<key> <worker>' lines when given
+    """
+
+    def __init__(self, join_seconds: float = 0.5, success_rate: float = 1.0, lead: float = 1.0,
+                 log: Optional[str] = None, worker_id: str = ""):
+        self.join_seconds = join_seconds
+        self.success_rate = success_rate
+        self.lead = lead
+        self.log = log
+        self.worker_id = worker_id
+        self._lock = threading.Lock()
+
+    def __call__(self, meeting: Meeting, lease: Optional[LeaseToken] = None) -> bool:
+        lease = lease or LeaseToken(float("inf"), time.monotonic())
+        if lease.wait(max(0.0, meeting.start - self.lead - time.time())) or lease.wait(self.join_seconds):
+            return False
+        if self.log:
+            with self._lock, open(self.log, "a") as file:
+                file.write(f"{meeting.key} {self.worker_id}\n")
+        return random.random() < self.success_rate
+
+
+def fake_meetings(count: int, spacing: float = 1.0, first_in: float = 2.0) -> List[Meeting]:
+    """Generate fake schedule: `count` meetings, one every `spacing` seconds"""
+
+    now = time.time()
+    return [Meeting(key=f"fake-{number}", subject=f"Fake meeting {number}",
+                    url=f"//teams.microsoft.com/l/meetup-join/fake-{number}", start=now + first_in + number * spacing)
+            for number in range(count)]
+
+
+def meeting_key(identity: str, start: float) -> str:
+    """Schedule key of one occurrence. Join URL or UID alone is shared by every occurrence of a series, personal
+    meeting room and channel meetings, so start is part of the key
+    """
+
+    return f"{identity}/{datetime.datetime.fromtimestamp(start).isoformat()}"
+
+
+def ics_meetings(path: str, lookahead_days: int = 1) -> List[Meeting]:
+    """Read meetings of lookahead window from .ics file. No Windows dependencies, usable for load tests"""
+
+    import ics_calendar
+
+    begin = datetime.datetime.combine(datetime.date.today(), datetime.time())
+    meetings = list()
+    for event in ics_calendar.read_events(path, begin, begin + datetime.timedelta(days=lookahead_days)):
+        if event.join_url:
+            meetings.append(Meeting(key=meeting_key(event.uid, event.start.timestamp()), subject=event.subject,
+                                    url=event.join_url.split(":", 1)[-1], start=event.start.timestamp(),
+                                    organizer=event.organizer, location=event.location, appointment_id=event.uid))
+    return meetings
+
+
+def calendar_meetings(calendar) -> List[Meeting]:
+    """Convert `available_meetings` of CalendarSource into wire meetings"""
+
+    meetings = list()
+    for _, url, _, meet_object in calendar.available_meetings():
+        if url:
+            meetings.append(Meeting(key=meeting_key(url, meet_object.StartTimestamp), subject=meet_object.Subject,
+                                    url=url, start=meet_object.StartTimestamp, organizer=meet_object.GetOrganizer,
+                                    location=meet_object.Location or "",
+                                    appointment_id=getattr(meet_object, "GlobalAppointmentID", None) or ""))
+    return meetings
+
+
+def outlook_meetings(start_before: int) -> List[Meeting]:
+    """Read today`s meetings from Outlook on this host"""
+
+    from auto_join_teams_meeting import OutlookApi
+
+    return calendar_meetings(OutlookApi(time_before=start_before))
+
+
+def teams_joiner(mic: str, camera: str, start_before: int, join_before: float = 0) -> Callable[
+        [Meeting, Optional[LeaseToken]], bool]:
+    """Real join backend: run TeamsRunner.main for assigned meeting on this machine. Join press is cancelled with
+    lease
+    """
+
+    from auto_join_teams_meeting import (AssignedCalendar, DataStorage, EnumActiveWindows, IUIAutomation, MouseEvents,
+                                         SearchPattern, TeamsRunner)
+
+    enum = EnumActiveWindows()
+    mouse = MouseEvents()
+    iui_auto = partial(IUIAutomation, camera=camera, mic=mic)
+
+    def join(meeting: Meeting, lease: Optional[LeaseToken] = None) -> bool:
+        search_pattern = SearchPattern()
+        search_pattern.add_name(meeting.subject)
+        meet_object = DataStorage()
+        for name, value in dict(Start=time.ctime(meeting.start), Subject=meeting.subject, StartTimestamp=meeting.start,
+                                GetOrganizer=meeting.organizer, Location=meeting.location).items():
+            setattr(meet_object, name, value)
+        meeting_data = (meeting.start - time.time(), meeting.url, search_pattern, meet_object)
+        # Schedule is owned by coordinator. Worker only waits and opens URLs
+        outlook = AssignedCalendar(time_before=start_before)
+        joined, _ = TeamsRunner.main(meeting_data, enum=enum, iui_auto=iui_auto, outlook=outlook, mouse=mouse,
+                                     join_before=join_before, cancelled=lease.cancelled if lease else None)
+        return joined
+
+    return join
+
+
+def merge_calendar(coordinator: Coordinator, calendar: Callable[[], List[Meeting]]) -> int:
+    """Read calendar and merge it into schedule. Unreadable calendar is skipped until next refresh"""
+
+    try:
+        return coordinator.merge(calendar())
+    except Exception as error:
+        warnings.warn(f"Coordinator calendar was not read: {error!r}")
+        return 0
+
+
+def _address(value: str) -> tuple:
+    host, _, port = value.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Teams AUTO-JOIN coordinator mode")
+    subparsers = parser.add_subparsers(dest="role", required=True)
+
+    coordinator_parser = subparsers.add_parser("coordinator", help="Own merged schedule and hand out meetings")
+    coordinator_parser.add_argument("--address", type=_address, default=("0.0.0.0", 8765),
+                                    help="host:port to listen on")
+    coordinator_parser.add_argument("--start_before", type=int, default=3 * 60,
+                                    help="Provide time (seconds) to join before actual meeting has started")
+    coordinator_parser.add_argument("--dispatch_ahead", type=float, default=None,
+                                    help="Hand meeting to worker this many seconds before start. "
+                                         "Default: start_before + 120")
+    coordinator_parser.add_argument("--lease", type=float, default=15.0, help="Lease time (seconds)")
+    coordinator_parser.add_argument("--heartbeat", type=float, default=3.0, help="Worker heartbeat (seconds)")
+    coordinator_parser.add_argument("--fake_meetings", type=int, default=0,
+                                    help="Use N generated meetings instead of Outlook calendar")
+    coordinator_parser.add_argument("--ics", type=str, default=None,
+                                    help="Read meetings from iCalendar (.ics) file instead of Outlook calendar")
+    coordinator_parser.add_argument("--fake_spacing", type=float, default=1.0,
+                                    help="Seconds between generated meetings")
+    coordinator_parser.add_argument("--no_local_calendar", action="store_true",
+                                    help="Schedule only meetings from calendars contributed by workers")
+    coordinator_parser.add_argument("--min_calendars", type=int, default=0,
+                                    help="Keep serving until this many workers contributed their calendars")
+    coordinator_parser.add_argument("--refresh", type=float, default=300.0,
+                                    help="Re-read Outlook or .ics calendar of coordinator every this many seconds")
+
+    worker_parser = subparsers.add_parser("worker", help="Join meetings handed out by coordinator")
+    worker_parser.add_argument("--address", type=_address, default=("127.0.0.1", 8765),
+                               help="Coordinator host:port")
+    worker_parser.add_argument("--worker_id", type=str, default=None)
+    worker_parser.add_argument("--capacity", type=int, default=2, help="Concurrent joins on this machine")
+    worker_parser.add_argument("--backend", type=str, choices=("teams", "fake"), default="teams")
+    worker_parser.add_argument("--mic", type=str, default="off")
+    worker_parser.add_argument("--camera", type=str, default="off")
+    worker_parser.add_argument("--start_before", type=int, default=3 * 60)
+    worker_parser.add_argument("--join_before", type=float, default=0)
+    worker_parser.add_argument("--fake_success_rate", type=float, default=1.0)
+    worker_parser.add_argument("--fake_log", type=str, default=None, help="Append fake Join presses to this file")
+    worker_parser.add_argument("--share_outlook", action="store_true",
+                               help="Contribute Outlook calendar of this machine to the merged schedule")
+    worker_parser.add_argument("--share_ics", type=str, default=None,
+                               help="Contribute meetings of this iCalendar (.ics) file to the merged schedule")
+
+    arguments = parser.parse_args()
+
+    if arguments.role == "coordinator":
+        dispatch_ahead = arguments.dispatch_ahead
+        if dispatch_ahead is None:
+            dispatch_ahead = arguments.start_before + 120
+        coordinator = Coordinator(dispatch_ahead=dispatch_ahead, lease=arguments.lease, heartbeat=arguments.heartbeat,
+                                  min_calendars=arguments.min_calendars)
+        calendar = None
+        if arguments.no_local_calendar:
+            pass
+        elif arguments.fake_meetings:
+            coordinator.merge(fake_meetings(arguments.fake_meetings, spacing=arguments.fake_spacing))
+        elif arguments.ics:
+            calendar = partial(ics_meetings, arguments.ics)
+        else:
+            calendar = partial(outlook_meetings, arguments.start_before)
+        if calendar is not None:
+            merge_calendar(coordinator, calendar)
+        server = CoordinatorServer(arguments.address, coordinator)
+        threading.Thread(target=server.serve_forever, name="CoordinatorServer", daemon=True).start()
+        next_refresh = time.monotonic() + arguments.refresh
+        status = None
+        while not coordinator.finished():
+            time.sleep(arguments.heartbeat)
+            if calendar is not None and time.monotonic() >= next_refresh:
+                # Meetings added to calendar during the day are picked up on the next refresh
+                merge_calendar(coordinator, calendar)
+                next_refresh = time.monotonic() + arguments.refresh
+            coordinator.reap()
+            current = (coordinator.summary(), {state.worker: len(state.held) for state in coordinator.workers.values()})
+            if current != status:
+                status = current
+                print(f"Schedule: {current[0]} Workers: {current[1]}", flush=True)
+        # Let workers poll once more, they stop on 'finished' reply
+        time.sleep(2 * arguments.heartbeat)
+        server.shutdown()
+        print(f"Finished meetings: {coordinator.summary()}")
+    else:
+        worker_id = arguments.worker_id or f"{socket.gethostname()}-{uuid.uuid4().hex[:6]}"
+        if arguments.backend == "fake":
+            joiner = FakeJoiner(success_rate=arguments.fake_success_rate, log=arguments.fake_log, worker_id=worker_id)
+        else:
+            joiner = teams_joiner(arguments.mic, arguments.camera, arguments.start_before, arguments.join_before)
+        calendar = None
+        if arguments.share_ics:
+            calendar = partial(ics_meetings, arguments.share_ics)
+        elif arguments.share_outlook:
+            calendar = partial(outlook_meetings, arguments.start_before)
+        agent = WorkerAgent(arguments.address, joiner, worker_id=worker_id, capacity=arguments.capacity,
+                            calendar=calendar)
+        try:
+            agent.run()
+        except KeyboardInterrupt:
+            agent.stop()
@@ -0,0 +1,435 @@
+"""Streaming iCalendar (.ics) reader.
+
+The file is read line by line, VEVENTs are parsed one at a time and RRULE recurrences are expanded lazily, only
+inside the lookahead window. Memory is bounded by the number of occurrences inside the window, not by file size,
+so exported calendars with hundreds of thousands of events stay cheap. No Windows dependencies.
+
+Reference:
+https://datatracker.ietf.org/doc/html/rfc5545
+"""
+from __future__ import annotations
+
+import calendar
+import datetime
+import re
+import warnings
+from dataclasses import dataclass
+from typing import Dict, Generator, Iterable, List, Optional, Tuple
+
+try:
+    from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+except ImportError:
+    ZoneInfo = None
+    ZoneInfoNotFoundError = KeyError
+
+# Only these properties are parsed, everything else is skipped by name. X- properties are scanned for join URL
+WANTED_PROPERTIES = {"UID", "SUMMARY", "DTSTART", "DTEND", "DURATION", "LOCATION", "DESCRIPTION", "ORGANIZER",
+                     "RRULE", "EXDATE", "RECURRENCE-ID", "STATUS", "URL"}
+JOIN_URL_RE = re.compile(r"https?://[^\s<>\"\\]*meetup-join[^\s<>\"\\]*")
+DURATION_RE = re.compile(r"(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+                         r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?")
+NAME_RE = re.compile(r"[^:;]*")
+WEEKDAYS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+# RRULE parts understood per FREQ. Rules with other BY* parts are skipped with warning instead of expanded wrongly
+SUPPORTED_RULE_PARTS = {"DAILY": set(), "WEEKLY": {"BYDAY"},
+                        "MONTHLY": {"BYDAY", "BYMONTHDAY", "BYSETPOS"},
+                        "YEARLY": {"BYDAY", "BYMONTHDAY", "BYSETPOS", "BYMONTH"}}
+
+
+@dataclass()
+class IcsEvent:
+    """One meeting occurrence inside lookahead window. Times are naive local datetimes"""
+
+    uid: str
+    subject: str
+    start: datetime.datetime
+    end: datetime.datetime
+    location: str = ""
+    organizer: str = ""
+    description: str = ""
+    join_url: Optional[str] = None
+    recurrence_id: Optional[datetime.datetime] = None
+
+
+def unfolded_lines(file: Iterable[str]) -> Generator[str, None, None]:
+    """Yield logical content lines. Folded continuation lines (leading space or tab) are joined"""
+
+    current = None
+    for raw in file:
+        line = raw.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def parse_content_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """Split content line into name, parameters and value"""
+
+    head, _, value = line.partition(":")
+    # Quoted parameter values may contain ':' (e.g. TZID="(UTC+01:00) ..."). Re-split outside quotes
+    if head.count('"') % 2:
+        quote_end = line.index('"', len(head) + 1)
+        colon = line.index(":", quote_end)
+        head, value = line[:colon], line[colon + 1:]
+    name, *parameters = head.split(";")
+    params = dict()
+    for parameter in parameters:
+        key, _, parameter_value = parameter.partition("=")
+        params[key.upper()] = parameter_value.strip('"')
+    return name.upper(), params, value
+
+
+def unescape_text(value: str) -> str:
+    """Unescape TEXT value"""
+
+    return value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";") \
+        .replace("\\\\", "\\")
+
+
+def iter_vevents(file: Iterable[str]) -> Generator[Dict[str, List[str]], None, None]:
+    """Yield VEVENT components one by one as {name: [content line, ...]}. Nested components are skipped.
+    Lines are parsed lazily by `first_property` / `all_properties`, so events outside window cost little.
+    """
+
+    event = None
+    nested = 0
+    for line in unfolded_lines(file):
+        if line.startswith("BEGIN:"):
+            if line == "BEGIN:VEVENT":
+                event = dict()
+            elif event is not None:
+                nested += 1
+            continue
+        if line.startswith("END:"):
+            if line == "END:VEVENT" and event is not None:
+                yield event
+                event = None
+                nested = 0
+            elif event is not None and nested:
+                nested -= 1
+            continue
+        if event is None or nested:
+            continue
+        name = NAME_RE.match(line).group().upper()
+        if name in WANTED_PROPERTIES or name.startswith("X-"):
+            event.setdefault(name, list()).append(line)
+
+
+def all_properties(event: Dict[str, List[str]], name: str) -> List[Tuple[Dict[str, str], str]]:
+    """Parsed (params, value) of every occurrence of property"""
+
+    return [parse_content_line(line)[1:] for line in event.get(name, list())]
+
+
+def first_property(event: Dict[str, List[str]], name: str) -> Tuple[Dict[str, str], str]:
+    """Parsed (params, value) of first occurrence of property. Empty value when absent"""
+
+    lines = event.get(name)
+    if not lines:
+        return dict(), ""
+    _, params, value = parse_content_line(lines[0])
+    return params, value
+
+
+def parse_datetime(value: str, params: Dict[str, str]) -> datetime.datetime:
+    """Parse DATE / DATE-TIME value into naive local datetime"""
+
+    value = value.strip()
+    # Slicing is several times faster than strptime, which matters on large calendars
+    moment = datetime.datetime(int(value[0:4]), int(value[4:6]), int(value[6:8]))
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return moment
+    moment = moment.replace(hour=int(value[9:11]), minute=int(value[11:13]), second=int(value[13:15]))
+    utc = value.endswith("Z")
+    if utc:
+        return moment.replace(tzinfo=datetime.timezone.utc).astimezone().replace(tzinfo=None)
+    tzid = params.get("TZID")
+    if tzid and ZoneInfo is not None:
+        try:
+            return moment.replace(tzinfo=ZoneInfo(tzid)).astimezone().replace(tzinfo=None)
+        except (ZoneInfoNotFoundError, ValueError):
+            # Windows zone names (e.g. "FLE Standard Time") are not IANA names. Treat as local time
+            pass
+    return moment
+
+
+def parse_duration(value: str) -> datetime.timedelta:
+    """Parse DURATION value"""
+
+    match = DURATION_RE.fullmatch(value.strip())
+    if not match:
+        return datetime.timedelta()
+    parts = {name: int(number or 0) for name, number in match.groupdict().items() if name != "sign"}
+    duration = datetime.timedelta(weeks=parts["weeks"], days=parts["days"], hours=parts["hours"],
+                                  minutes=parts["minutes"], seconds=parts["seconds"])
+    return -duration if match.group("sign") == "-" else duration
+
+
+def extract_join_url(event: Dict[str, List[str]]) -> Optional[str]:
+    """Find Teams meetup-join URL in X- properties, URL, LOCATION or DESCRIPTION"""
+
+    names = sorted((name for name in event if name.startswith("X-")), key=lambda name: "TEAMS" not in name)
+    for name in names + ["URL", "LOCATION", "DESCRIPTION"]:
+        for _, value in all_properties(event, name):
+            match = JOIN_URL_RE.search(unescape_text(value))
+            if match:
+                return match.group(0)
+    return None
+
+
+def _parse_byday(value: str) -> List[Tuple[Optional[int], int]]:
+    """Parse BYDAY list into (ordinal, weekday) pairs. Ordinal is None for plain weekdays (e.g. "TU")"""
+
+    days = list()
+    for day in value.upper().split(","):
+        day = day.strip()
+        if day[-2:] in WEEKDAYS:
+            days.append((int(day[:-2]) if day[:-2] else None, WEEKDAYS[day[-2:]]))
+    return days
+
+
+def _scope_days(first: datetime.date, last: datetime.date, by_day: List[Tuple[Optional[int], int]],
+                month_days: List[int]) -> List[datetime.date]:
+    """Days of one month (or whole year) selected by BYMONTHDAY and BYDAY. Ordinals count inside [first, last]"""
+
+    if month_days:
+        # BYMONTHDAY expands, BYDAY then only limits weekdays
+        size = (last - first).days + 1
+        days = [first + datetime.timedelta(days=(day if day > 0 else size + 1 + day) - 1) for day in month_days
+                if 0 < abs(day) <= size]
+        weekdays = {weekday for _, weekday in by_day}
+        return [day for day in days if not weekdays or day.weekday() in weekdays]
+    days = list()
+    for ordinal, weekday in by_day:
+        matching = first + datetime.timedelta(days=(weekday - first.weekday()) % 7)
+        candidates = [matching + datetime.timedelta(weeks=week) for week in range((last - matching).days // 7 + 1)]
+        if ordinal is None:
+            days.extend(candidates)
+        elif 0 < abs(ordinal) <= len(candidates):
+            days.append(candidates[ordinal - 1 if ordinal > 0 else ordinal])
+    return days
+
+
+def _period_days(rule: Dict[str, str], dtstart: datetime.datetime, year: int,
+                 month: Optional[int]) -> List[datetime.date]:
+    """Sorted days of one MONTHLY (month given) or YEARLY (month None) period after BYxxx and BYSETPOS"""
+
+    by_day = _parse_byday(rule.get("BYDAY", ""))
+    month_days = [int(day) for day in rule.get("BYMONTHDAY", "").split(",") if day.strip()]
+    if month is not None:
+        months = [month]
+    elif "BYMONTH" in rule:
+        months = sorted({int(number) for number in rule["BYMONTH"].split(",") if number.strip()})
+    elif month_days:
+        months = list(range(1, 13))
+    elif by_day:
+        # YEARLY BYDAY without BYMONTH: ordinals count inside the whole year (e.g. 20MO is 20th Monday)
+        months = None
+    else:
+        months = [dtstart.month]
+    if not by_day and not month_days:
+        month_days = [dtstart.day]
+
+    days = set()
+    if months is None:
+        days.update(_scope_days(datetime.date(year, 1, 1), datetime.date(year, 12, 31), by_day, month_days))
+    for number in months or ():
+        first = datetime.date(year, number, 1)
+        last = first.replace(day=calendar.monthrange(year, number)[1])
+        days.update(_scope_days(first, last, by_day, month_days))
+    days = sorted(days)
+    if "BYSETPOS" in rule:
+        positions = [int(position) for position in rule["BYSETPOS"].split(",") if position.strip()]
+        days = sorted({days[position - 1 if position > 0 else position] for position in positions
+                       if 0 < abs(position) <= len(days)})
+    return days
+
+
+def expand_rrule(dtstart: datetime.datetime, rrule: str, begin: datetime.datetime,
+                 end: datetime.datetime) -> Generator[datetime.datetime, None, None]:
+    """Lazily yield occurrence starts of RRULE which fall into [begin, end).
+
+    Supported: FREQ DAILY/WEEKLY/MONTHLY/YEARLY, INTERVAL, COUNT, UNTIL, WKST, BYDAY for WEEKLY, BYDAY (with
+    ordinals), BYMONTHDAY and BYSETPOS for MONTHLY/YEARLY and BYMONTH for YEARLY. Rules using other parts are skipped
+    with warning. Rules without COUNT jump straight to the window instead of walking from DTSTART, so old long
+    running series cost nothing (DAILY and WEEKLY ones advance COUNT arithmetically and jump too).
+    """
+
+    rule = {name.upper(): value for name, value in
+            (part.split("=", 1) for part in rrule.strip().split(";") if "=" in part)}
+    frequency = rule.get("FREQ", "DAILY").upper()
+    unsupported = {name for name in rule if name.startswith("BY")} - SUPPORTED_RULE_PARTS.get(frequency, set())
+    if frequency == "WEEKLY" and any(ordinal is not None for ordinal, _ in _parse_byday(rule.get("BYDAY", ""))):
+        unsupported.add("BYDAY")
+    if unsupported or frequency not in SUPPORTED_RULE_PARTS:
+        warnings.warn(f"RRULE {rrule!r} was skipped: {', '.join(sorted(unsupported)) or frequency} not supported")
+        return
+    interval = max(1, int(rule.get("INTERVAL", 1)))
+    count = int(rule["COUNT"]) if "COUNT" in rule else None
+    until = parse_datetime(rule["UNTIL"], dict()) if "UNTIL" in rule else None
+    if until is not None and until.time() == datetime.time() and len(rule["UNTIL"]) == 8:
+        until += datetime.timedelta(days=1)
+    limit = min(end, until + datetime.timedelta(seconds=1)) if until is not None else end
+
+    if frequency in ("DAILY", "WEEKLY"):
+        if frequency == "DAILY":
+            period = datetime.timedelta(days=interval)
+            anchor = dtstart
+            offsets = [datetime.timedelta()]
+        else:
+            # Periods start on WKST day (Monday by default) of DTSTART week, BYDAY days are offsets inside the week.
+            # Week start decides which days share a period when INTERVAL > 1
+            week_start = WEEKDAYS.get(rule.get("WKST", "MO").upper(), 0)
+            period = datetime.timedelta(weeks=interval)
+            anchor = dtstart - datetime.timedelta(days=(dtstart.weekday() - week_start) % 7)
+            days = sorted({(WEEKDAYS[day[-2:]] - week_start) % 7 for day in rule.get("BYDAY", "").split(",")
+                           if day[-2:] in WEEKDAYS} or {(dtstart.weekday() - week_start) % 7})
+            offsets = [datetime.timedelta(days=day) for day in days]
+        # Jump over whole periods before window start. COUNT is advanced arithmetically
+        skipped = max(0, (begin - anchor) // period - 1)
+        emitted = 0
+        if count is not None and skipped:
+            first_period = sum(1 for offset in offsets if anchor + offset >= dtstart)
+            emitted = first_period + (skipped - 1) * len(offsets)
+        period_start = anchor + skipped * period
+        while period_start < limit:
+            for offset in offsets:
+                occurrence = period_start + offset
+                if occurrence < dtstart:
+                    continue
+                if occurrence >= limit or (count is not None and emitted >= count):
+                    return
+                emitted += 1
+                if occurrence >= begin:
+                    yield occurrence
+            period_start += period
+        return
+
+    # Days of a period depend only on the period itself. Without COUNT periods ending before window start are
+    # jumped over, COUNT depends on every earlier occurrence so such rules are walked from DTSTART
+    months = interval * (12 if frequency == "YEARLY" else 1)
+    emitted = 0
+    step = 0
+    if count is None:
+        elapsed = (begin.year - dtstart.year) * 12 + (begin.month - dtstart.month if frequency == "MONTHLY" else 0)
+        step = max(0, elapsed // months)
+    while True:
+        month_index = dtstart.month - 1 + months * step
+        year, month = dtstart.year + month_index // 12, month_index % 12 + 1
+        step += 1
+        if datetime.datetime(year, month if frequency == "MONTHLY" else 1, 1) >= limit:
+            return
+        for day in _period_days(rule, dtstart, year, month if frequency == "MONTHLY" else None):
+            occurrence = datetime.datetime.combine(day, dtstart.time())
+            if occurrence < dtstart:
+                continue
+            if occurrence >= limit or (count is not None and emitted >= count):
+                return
+            emitted += 1
+            if occurrence >= begin:
+                yield occurrence
+
+
+def _event_template(event: Dict[str, List[str]]) -> Dict[str, Optional[str]]:
+    """Text properties of VEVENT shared by all its occurrences"""
+
+    organizer_params, organizer = first_property(event, "ORGANIZER")
+    return dict(subject=unescape_text(first_property(event, "SUMMARY")[1]),
+                location=unescape_text(first_property(event, "LOCATION")[1]),
+                organizer=organizer_params.get("CN") or organizer.replace("mailto:", ""),
+                description=unescape_text(first_property(event, "DESCRIPTION")[1]),
+                join_url=extract_join_url(event))
+
+
+def events_in_window(file: Iterable[str], begin: datetime.datetime, end: datetime.datetime,
+                     skip_cancelled: bool = True) -> List[IcsEvent]:
+    """Stream file and return meeting occurrences starting inside [begin, end) sorted by start.
+
+    Overridden occurrences (RECURRENCE-ID) replace expanded ones and EXDATEs remove them, properties missing in
+    an override are inherited from its series. Only occurrences inside the window and unparsed lines of recurring
+    series starting before window end are kept in memory, overrides can therefore appear anywhere in the file.
+    """
+
+    occurrences: Dict[Tuple[str, datetime.datetime], IcsEvent] = dict()
+    overrides: Dict[Tuple[str, datetime.datetime], Optional[IcsEvent]] = dict()
+    # Series masters by UID. Override moved into window from occurrence outside of it has nothing to replace
+    series: Dict[str, Dict[str, List[str]]] = dict()
+    for event in iter_vevents(file):
+        if "DTSTART" not in event:
+            continue
+        start_params, start_value = first_property(event, "DTSTART")
+        dtstart = parse_datetime(start_value, start_params)
+        rrule = event.get("RRULE")
+        recurrence = event.get("RECURRENCE-ID")
+        if not rrule and not recurrence and not begin <= dtstart < end:
+            continue
+
+        if "DTEND" in event:
+            end_params, end_value = first_property(event, "DTEND")
+            duration = parse_datetime(end_value, end_params) - dtstart
+        elif "DURATION" in event:
+            duration = parse_duration(first_property(event, "DURATION")[1])
+        else:
+            duration = datetime.timedelta()
+        uid = first_property(event, "UID")[1]
+        cancelled = first_property(event, "STATUS")[1].upper() == "CANCELLED"
+        template = None
+
+        def build(occurrence_start: datetime.datetime, recurrence_id: Optional[datetime.datetime] = None):
+            # Text properties are parsed once per VEVENT, not once per occurrence
+            nonlocal template
+            if template is None:
+                template = _event_template(event)
+            return IcsEvent(uid=uid, start=occurrence_start, end=occurrence_start + duration,
+                            recurrence_id=recurrence_id, **template)
+
+        if recurrence:
+            recurrence_params, recurrence_value = first_property(event, "RECURRENCE-ID")
+            recurrence_id = parse_datetime(recurrence_value, recurrence_params)
+            if begin <= recurrence_id < end or begin <= dtstart < end:
+                overrides[(uid, recurrence_id)] = None if cancelled or not begin <= dtstart < end else build(
+                    dtstart, recurrence_id)
+            continue
+        if cancelled and skip_cancelled:
+            continue
+        if not rrule:
+            occurrences[(uid, dtstart)] = build(dtstart)
+            continue
+
+        if dtstart < end:
+            series[uid] = event
+        excluded = set()
+        for params, value in all_properties(event, "EXDATE"):
+            excluded.update(parse_datetime(part, params) for part in value.split(","))
+        for occurrence_start in expand_rrule(dtstart, first_property(event, "RRULE")[1], begin, end):
+            if occurrence_start not in excluded:
+                occurrences[(uid, occurrence_start)] = build(occurrence_start)
+
+    templates: Dict[str, Dict[str, Optional[str]]] = dict()
+    for key, override in overrides.items():
+        occurrences.pop(key, None)
+        # Exceptions often carry only changed properties. Join URL, location etc. are inherited from the series
+        master = series.get(key[0])
+        if override is None or master is None:
+            continue
+        if key[0] not in templates:
+            templates[key[0]] = _event_template(master)
+        for name, value in templates[key[0]].items():
+            if not getattr(override, name):
+                setattr(override, name, value)
+    window = list(occurrences.values()) + [override for override in overrides.values() if override is not None]
+    return sorted(window, key=lambda occurrence: occurrence.start)
+
+
+def read_events(path: str, begin: datetime.datetime, end: datetime.datetime) -> List[IcsEvent]:
+    """Read .ics file and return meeting occurrences inside window"""
+
+    with open(path, encoding="utf-8", errors="replace") as file:
+        return events_in_window(file, begin, end)
+
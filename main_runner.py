@@ -1,8 +1,46 @@
 import argparse
+import os
 import sys
 from functools import partial
+from typing import Optional
+
+from auto_join_teams_meeting import (CalendarSource, ColdStartHistory, EnumActiveWindows, IcsCalendar, IUIAutomation,
+                                     JoinLatencyHistory, MouseEvents, OutlookApi, ProcessJoinRunner, TeamsRunner,
+                                     TeamsSupervisor)
+from profiling import StageProfiler
+
+# Profiled stages: stage name -> (owner class, method names)
+PROFILE_STAGES = {
+    "meetings": (CalendarSource, ["available_meetings"]),
+    "join": (TeamsRunner, ["main"]),
+    "warm_up": (TeamsRunner, ["warm_up"]),
+    "commit": (TeamsRunner, ["commit"]),
+    "discovery": (TeamsRunner, ["discover_controls"]),
+    "uia": (IUIAutomation, ["child_siblings_from_root_element", "region_control_siblings_from_document_control",
+                            "get_microphone_control_type", "get_toolbar_control_type", "get_camera_control_type"]),
+}
+
+
+def setup_profiler(stages: str, mode: str, output_dir: str, trace_memory: bool,
+                   profile_stages: Optional[dict] = None) -> StageProfiler:
+    """Instrument selected stages ('all' or comma separated names) and start profiler. `profile_stages` maps stages
+    to other (e.g. fake) backend classes
+    """
+
+    profile_stages = profile_stages or PROFILE_STAGES
+    profiler = StageProfiler(output_dir=output_dir, mode=mode)
+    selected = list(profile_stages) if stages == "all" else [stage.strip() for stage in stages.split(",") if stage]
+    for stage in selected:
+        if stage not in profile_stages:
+            sys.exit(f"Unknown profile stage {stage!r}. Choose from: all, {', '.join(profile_stages)}")
+        owner, method_names = profile_stages[stage]
+        profiler.instrument(owner, method_names, stage=stage)
+    if trace_memory:
+        profiler.start_tracemalloc()
+        profiler.install_snapshot_signal()
+    profiler.start()
+    return profiler
 
-from auto_join_teams_meeting import OutlookApi, IUIAutomation, EnumActiveWindows, MouseEvents, TeamsRunner
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(description="Teams AUTO-JOIN. For additional parameter info use --help")
@@ -13,19 +51,98 @@ if __name__ == '__main__':
                         help="Provide flag for camera: 'on' or 'off'. Note: this set up for all upcoming meetings",
                         )
     parser.add_argument("--start_before", type=int, required=False,
-                        help="Provide time (seconds) to join before actual meeting has started",
+                        help="Provide upper bound time (seconds) to start joining before actual meeting has started. "
+                             "Actual lead time is learned from join latency history",
                         default=3 * 60)
+    parser.add_argument("--join_before", type=float, required=False,
+                        help="Provide time (seconds) before meeting start when Join button is pressed. Lobby is "
+                             "warmed up --start_before seconds ahead",
+                        default=0)
+    parser.add_argument("--isolate", action="store_true",
+                        help="Run every join in separate worker process with hard timeout")
+    parser.add_argument("--handoff_gap", type=float, required=False,
+                        help="Hand off back-to-back meetings: when meeting starts at most this many seconds after "
+                             "previous one ends, previous call is left just before Join and its Teams window is "
+                             "reused. 0 disables hand-off. Can not be combined with --isolate",
+                        default=0)
+    parser.add_argument("--ics", type=str, required=False,
+                        help="Provide exported iCalendar (.ics) file to read meetings from instead of Outlook",
+                        default=None)
+    parser.add_argument("--outlook_timeout", type=float, required=False,
+                        help="Provide time (seconds) after which hung Outlook call is abandoned",
+                        default=10.0)
+    parser.add_argument("--latency_history", type=str, required=False,
+                        help="Provide join latency history file used to adapt lead time. Empty string disables it",
+                        default=os.path.join(os.path.expanduser("~"), ".auto_team", "join_latency.json"))
+    parser.add_argument("--per_hour_lead", action="store_true",
+                        help="Learn lead time separately for each hour of the day")
+    parser.add_argument("--teams_cold_start", type=float, required=False,
+                        help="Provide expected Teams cold start (seconds). Teams is checked and launched this long "
+                             "before each warm-up and kept running in meeting heavy periods (e.g. 60). Default 0 "
+                             "disables supervisor",
+                        default=0.0)
+    parser.add_argument("--teams_start_history", type=str, required=False,
+                        help="Provide Teams cold start history file used to adapt cold start estimate. Empty string "
+                             "disables it",
+                        default=os.path.join(os.path.expanduser("~"), ".auto_team", "teams_cold_start.json"))
+    parser.add_argument("--profile", type=str, required=False,
+                        help=f"Profile stages: 'all' or comma separated list of {', '.join(PROFILE_STAGES)}",
+                        default=None)
+    parser.add_argument("--profile_mode", type=str, required=False, choices=StageProfiler.modes,
+                        help="Profiler type: deterministic (cProfile dump per stage call) or sampling "
+                             "(collapsed stacks per stage)",
+                        default="deterministic")
+    parser.add_argument("--profile_dir", type=str, required=False,
+                        help="Directory for profile dumps and memory snapshots",
+                        default="profiles")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Trace memory allocations. Snapshot is written on Ctrl+Break (SIGUSR1 on Linux) "
+                             "and at exit")
 
     arguments = parser.parse_args()
+    if arguments.isolate and arguments.handoff_gap > 0:
+        # Join state (open call, Teams window) lives in the worker process and can not be handed to the next worker
+        parser.error("--handoff_gap can not be combined with --isolate")
+
+    profiler = None
+    if arguments.profile or arguments.tracemalloc:
+        profiler = setup_profiler(arguments.profile or "", arguments.profile_mode, arguments.profile_dir,
+                                  arguments.tracemalloc)
 
-    outlook_class = OutlookApi(time_before=arguments.start_before)
+    latency_history = None
+    if arguments.latency_history:
+        latency_history = JoinLatencyHistory(arguments.latency_history, per_hour=arguments.per_hour_lead)
+    if arguments.ics:
+        outlook_class = IcsCalendar(arguments.ics, time_before=arguments.start_before, latency_history=latency_history)
+    else:
+        outlook_class = OutlookApi(time_before=arguments.start_before, call_timeout=arguments.outlook_timeout,
+                                   latency_history=latency_history)
     planned_meetings = outlook_class.available_meetings()
     wrapp_iui_auto = partial(IUIAutomation, camera=arguments.camera, mic=arguments.mic)
+    runner = None
+    if arguments.isolate:
+        # Join worker processes profile the same stages into the same directory
+        worker_setup = partial(setup_profiler, arguments.profile, arguments.profile_mode, arguments.profile_dir,
+                               False) if arguments.profile else None
+        runner = ProcessJoinRunner(worker_setup=worker_setup).main
     enum_class = EnumActiveWindows()
     mouse_event = MouseEvents()
+    supervisor = None
+    if arguments.teams_cold_start > 0:
+        cold_start_history = None
+        if arguments.teams_start_history:
+            cold_start_history = ColdStartHistory(arguments.teams_start_history)
+        supervisor = TeamsSupervisor(enum_class, cold_start=arguments.teams_cold_start, history=cold_start_history)
     run_meetings_bool, run_meetings_list = TeamsRunner.run_meetings(planned_meetings, enum=enum_class,
                                                                     iui_auto=wrapp_iui_auto,
-                                                                    outlook=outlook_class, mouse=mouse_event)
+                                                                    outlook=outlook_class, mouse=mouse_event,
+                                                                    join_before=arguments.join_before,
+                                                                    runner=runner,
+                                                                    handoff_gap=arguments.handoff_gap,
+                                                                    supervisor=supervisor)
+    if profiler:
+        profiler.stop()
+        profiler.snapshot_memory(label="memory-at-exit")
     if not run_meetings_bool:
         sys.exit("There are no meetings to start. Quiting.")
     sys.exit(f"Quiting threads. Finished meetings: {*run_meetings_list,}")
\ No newline at end of file
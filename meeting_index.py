@@ -0,0 +1,135 @@
+"""De-duplication index for meetings merged from several calendars.
+
+The same Teams meeting shows up as a forwarded copy, on a shared calendar, or as an occurrence and its exception.
+Copies are recognized by two identifiers: Teams thread id of the normalized join URL and GlobalAppointmentID
+(with the instance date cleared, so occurrence and exception share it). Two entries are one meeting when any
+identifier matches and their starts differ by at most `tolerance` seconds. Starts are bucketed by tolerance, every
+lookup inspects three buckets per identifier, so merging n meetings is O(n). No Windows dependencies.
+
+Reference:
+https://docs.microsoft.com/en-us/office/client-developer/outlook/mapi/pidlidglobalobjectid-canonical-property
+"""
+from __future__ import annotations
+
+import re
+import urllib.parse
+from typing import Any, Dict, List, Optional, Tuple
+
+THREAD_ID_RE = re.compile(r"meetup-join/([^/?#\s]+)")
+# GlobalObjectId starts with fixed class id, bytes 16-19 hold instance date (YH, YL, M, D) of exception
+GLOBAL_OBJECT_CLASS_ID = "040000008200E00074C5B7101A82E008"
+INSTANCE_DATE = slice(32, 40)
+
+
+def join_thread_id(url: Optional[str]) -> Optional[str]:
+    """Teams thread id ('19:meeting_...@thread.v2') of meetup-join URL in any of its forms (https:, msteams:,
+    percent encoded or not)
+    """
+
+    if not url:
+        return None
+    match = THREAD_ID_RE.search(url)
+    if not match:
+        return None
+    return urllib.parse.unquote(match.group(1)).lower()
+
+
+def clean_appointment_id(value: Any) -> Optional[str]:
+    """GlobalAppointmentID as upper hex without instance date. Non Outlook ids (e.g. iCalendar UID) are kept as is"""
+
+    if not value:
+        return None
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        value = bytes(value).hex()
+    value = str(value).strip().upper()
+    if value.startswith(GLOBAL_OBJECT_CLASS_ID) and len(value) >= INSTANCE_DATE.stop:
+        value = value[:INSTANCE_DATE.start] + "0" * (INSTANCE_DATE.stop - INSTANCE_DATE.start) + \
+                value[INSTANCE_DATE.stop:]
+    return value
+
+
+def meeting_identifiers(url: Optional[str], appointment_id: Any = None) -> List[Tuple[str, str]]:
+    """Identifiers under which meeting is indexed"""
+
+    identifiers = list()
+    thread_id = join_thread_id(url)
+    if thread_id:
+        identifiers.append(("thread", thread_id))
+    appointment_id = clean_appointment_id(appointment_id)
+    if appointment_id:
+        identifiers.append(("appointment", appointment_id))
+    return identifiers
+
+
+class MeetingIndex:
+    """Index of unique meetings. Copies linked through different identifiers (forward known by thread id,
+    exception known by appointment id) are merged with union-find, `unique` returns one entry per meeting
+    """
+
+    def __init__(self, tolerance: float = 300.0):
+        self.tolerance = tolerance
+        self.entries: List[Any] = list()
+        self.starts: List[float] = list()
+        self.duplicates = 0
+        self._parent: List[int] = list()
+        self._buckets: Dict[Tuple[str, str, int], List[int]] = dict()
+
+    def _bucket(self, start: float) -> int:
+        return int(start // self.tolerance)
+
+    def root(self, position: int) -> int:
+        """Position of entry which represents the meeting"""
+
+        parent = self._parent
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    def find(self, identifiers: List[Tuple[str, str]], start: float) -> List[int]:
+        """Representatives of already indexed meetings with one of identifiers and start within tolerance"""
+
+        bucket = self._bucket(start)
+        found = list()
+        for kind, identifier in identifiers:
+            for near in (bucket - 1, bucket, bucket + 1):
+                for position in self._buckets.get((kind, identifier, near), ()):
+                    if abs(self.starts[position] - start) <= self.tolerance:
+                        root = self.root(position)
+                        if root not in found:
+                            found.append(root)
+        return found
+
+    def add(self, identifiers: List[Tuple[str, str]], start: float, entry: Any) -> Tuple[int, bool]:
+        """Index entry. Returns its position and True for new meeting, or representative of the meeting it
+        duplicates and False. Meetings which turn out to be one (entry links them) are merged into the earliest
+        """
+
+        found = self.find(identifiers, start)
+        position = len(self.entries)
+        self.entries.append(entry)
+        self.starts.append(start)
+        self._parent.append(position)
+        root = min(found) if found else position
+        for other in found + [position]:
+            if other != root:
+                self._parent[other] = root
+                self.duplicates += 1
+
+        # Bucket keeps one position per meeting, so many copies of one meeting do not slow down lookups
+        bucket = self._bucket(start)
+        for kind, identifier in identifiers:
+            positions = self._buckets.setdefault((kind, identifier, bucket), list())
+            if not any(self.root(indexed) == root for indexed in positions):
+                positions.append(position)
+        return root, not found
+
+    def replace(self, position: int, entry: Any):
+        """Keep better copy (e.g. one with join URL) as representative of already indexed meeting"""
+
+        self.entries[self.root(position)] = entry
+
+    def unique(self) -> List[Any]:
+        """One entry per meeting, in order of first appearance"""
+
+        return [entry for position, entry in enumerate(self.entries) if self.root(position) == position]
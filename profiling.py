@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import cProfile
+import inspect
+import itertools
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class StageProfiler:
+    """Profile selected join pipeline stages in place.
+
+    Stages are methods of backend classes (real or fake) wrapped with `instrument`. Two modes:
+    deterministic - every stage call runs under cProfile, each call is dumped to `<stage>-<pid>-<n>.prof`
+                    (open with `python -m pstats` or snakeviz). Stage called inside another stage of the same
+                    thread gets its own dump and is included in the dump of the outer one.
+    sampling      - one background thread samples stacks of threads which are inside a stage and dumps
+                    `<stage>-<pid>.collapsed` stack counts on `stop` (flamegraph.pl / speedscope format).
+
+    Python 3.12+ allows one active cProfile per process and it records every thread. In deterministic mode a stage
+    call which starts while another one is profiled is sampled instead, and a `.prof` dump may include work of other
+    threads which ran meanwhile. Use sampling mode for an exact per thread picture of concurrent joins. File names
+    carry process id, so join worker processes (--isolate) can share one output directory.
+
+    Memory snapshots (tracemalloc) can be taken on demand with `snapshot_memory` or by signal
+    (Ctrl+Break on Windows, SIGUSR1 elsewhere) once `install_snapshot_signal` is called.
+
+    Reference:
+    https://docs.python.org/3/library/profile.html
+    https://docs.python.org/3/library/tracemalloc.html
+    """
+
+    modes = ("deterministic", "sampling")
+
+    def __init__(self, output_dir: str = "profiles", mode: str = "deterministic", interval: float = 0.005):
+        if mode not in self.modes:
+            raise ValueError(f"Profile mode must be one of {self.modes}, got {mode!r}")
+        self.output_dir = output_dir
+        self.mode = mode
+        self.interval = interval
+        self._counter = itertools.count()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._active: Dict[int, List[str]] = dict()
+        self._samples: Dict[str, Counter] = dict()
+        self._sampler = None
+        self._stop = threading.Event()
+        # Deterministic stage calls which were sampled because another cProfile was active
+        self.sampled_fallbacks = 0
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.output_dir, name)
+
+    def instrument(self, owner: Any, method_names: List[str], stage: str):
+        """Replace methods of class (or instance) with stage profiling wrappers. Static and class methods are kept"""
+
+        for method_name in method_names:
+            attribute = inspect.getattr_static(owner, method_name)
+            if isinstance(attribute, staticmethod):
+                setattr(owner, method_name, staticmethod(self.wrap(stage, attribute.__func__)))
+            elif isinstance(attribute, classmethod):
+                setattr(owner, method_name, classmethod(self.wrap(stage, attribute.__func__)))
+            elif isinstance(attribute, property):
+                setattr(owner, method_name, property(self.wrap(stage, attribute.fget)))
+            else:
+                setattr(owner, method_name, self.wrap(stage, attribute))
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        """Profile every call of func as `stage`"""
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if self.mode == "sampling":
+                return self._run_sampled(stage, func, *args, **kwargs)
+            return self._run_deterministic(stage, func, *args, **kwargs)
+
+        return wrapper
+
+    def _run_deterministic(self, stage: str, func: Callable, *args, **kwargs):
+        """Run func under own cProfile. Profile of enclosing stage in the same thread is paused meanwhile and the
+        nested stats are added to it when it is dumped
+        """
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = list()
+        outer = stack[-1] if stack else None
+        if outer is not None:
+            outer[0].disable()
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Only one cProfile may be active at once on Python 3.12+. Concurrent stage call is sampled
+            with self._lock:
+                self.sampled_fallbacks += 1
+            self._start_sampler()
+            try:
+                return self._run_sampled(stage, func, *args, **kwargs)
+            finally:
+                self._resume(outer)
+        nested: List[pstats.Stats] = list()
+        stack.append((profile, nested))
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            stack.pop()
+            stats = pstats.Stats(profile)
+            for nested_stats in nested:
+                stats.add(nested_stats)
+            stats.dump_stats(self._path(f"{stage}-{os.getpid()}-{next(self._counter)}.prof"))
+            if outer is not None:
+                outer[1].append(stats)
+            self._resume(outer)
+
+    @staticmethod
+    def _resume(outer: Optional[Tuple[cProfile.Profile, list]]):
+        """Re-enable profile of enclosing stage"""
+
+        if outer is None:
+            return
+        try:
+            outer[0].enable()
+        except ValueError:
+            # Another thread took the only cProfile slot (3.12+). Rest of the outer stage is not profiled
+            pass
+
+    def _run_sampled(self, stage: str, func: Callable, *args, **kwargs):
+        """Mark current thread as being inside stage while func runs"""
+
+        thread_id = threading.get_ident()
+        with self._lock:
+            self._active.setdefault(thread_id, list()).append(stage)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            with self._lock:
+                stages = self._active[thread_id]
+                stages.remove(stage)
+                if not stages:
+                    del self._active[thread_id]
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        """Collapsed stack string: outermost;...;innermost"""
+
+        stack = list()
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def _sample_loop(self):
+        """Sampler thread body"""
+
+        while not self._stop.wait(self.interval):
+            with self._lock:
+                active = {thread_id: tuple(stages) for thread_id, stages in self._active.items()}
+            if not active:
+                continue
+            frames = sys._current_frames()
+            for thread_id, stages in active.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                stack = self._collapse(frame)
+                for stage in set(stages):
+                    self._samples.setdefault(stage, Counter())[stack] += 1
+
+    def _start_sampler(self):
+        """Start sampler thread once"""
+
+        with self._lock:
+            if self._sampler is not None:
+                return
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="StageSampler", daemon=True)
+            self._sampler.start()
+
+    def start(self):
+        """Start sampler thread (sampling mode only). Deterministic mode starts it on first concurrent stage call"""
+
+        if self.mode == "sampling":
+            self._start_sampler()
+
+    def stop(self) -> List[str]:
+        """Stop sampler and write per stage collapsed stacks. Return written file paths"""
+
+        written = list()
+        if self._sampler is not None:
+            self._stop.set()
+            self._sampler.join()
+            self._sampler = None
+        for stage, samples in self._samples.items():
+            path = self._path(f"{stage}-{os.getpid()}.collapsed")
+            with open(path, "w") as file:
+                for stack, count in samples.most_common():
+                    file.write(f"{stack} {count}\n")
+            written.append(path)
+        if self.sampled_fallbacks:
+            print(f"{self.sampled_fallbacks} concurrent stage calls were sampled instead of profiled with cProfile "
+                  f"(one cProfile at a time on Python 3.12+). Their stacks are in .collapsed files")
+        return written
+
+    @staticmethod
+    def start_tracemalloc(frames: int = 25):
+        """Start tracing memory allocations"""
+
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def snapshot_memory(self, label: str = "memory", top: int = 10) -> Optional[Tuple[str, list]]:
+        """Dump tracemalloc snapshot and return its path with top allocation sites"""
+
+        if not tracemalloc.is_tracing():
+            return None
+        snapshot = tracemalloc.take_snapshot()
+        path = self._path(f"{label}-{time.strftime('%Y%m%d-%H%M%S')}-{next(self._counter)}.tracemalloc")
+        snapshot.dump(path)
+        top_stats = snapshot.statistics("lineno")[:top]
+        print(f"Memory snapshot {path}:", *top_stats, sep="\n")
+        return path, top_stats
+
+    def install_snapshot_signal(self) -> Optional[int]:
+        """Take memory snapshot when process receives Ctrl+Break (Windows) or SIGUSR1. Must run in main thread"""
+
+        snapshot_signal = getattr(signal, "SIGBREAK", None) or getattr(signal, "SIGUSR1", None)
+        if snapshot_signal is None:
+            return None
+        signal.signal(snapshot_signal, lambda signum, frame: self.snapshot_memory(label="memory-on-demand"))
+        return snapshot_signal
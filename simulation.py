@@ -0,0 +1,494 @@
+"""Time-warp simulation of the join scheduler.
+
+A simulated day (or week) of meetings is played through the real scheduling code: CalendarSource.available_meetings,
+TeamsRunner.run_meetings / main, lead time waits, retries, deadline shedding and Join press timing. Time comes from
+clocks.VirtualClock, Teams window, UI Automation tree and mouse are simulated, so thousands of meetings finish in
+seconds of real time. Report: warm-up and Join press accuracy (virtual time), executor queue depth and backlog of due
+meetings, threads and memory. Teams client may start closed, then its cold start is simulated.
+
+    python simulation.py --days 7 --meetings_per_day 400
+
+Stages are profiled like in main_runner (--profile), with simulated backends in place of the real ones.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import datetime
+import os
+import random
+import threading
+import time
+import tracemalloc
+import warnings
+from dataclasses import dataclass
+from functools import partial
+from typing import Dict, List, Optional, Tuple
+
+from auto_join_teams_meeting import (CalendarSource, ControlType, DataStorage, IUIAutomation, JoinLatencyHistory,
+                                     TeamsRunner, TeamsSupervisor, install_clock, metrics)
+from clocks import VirtualClock
+from main_runner import PROFILE_STAGES, setup_profiler
+from meeting_index import join_thread_id
+
+# UIA_ButtonControlTypeId
+BUTTON_CONTROL_TYPE = 50000
+
+
+@dataclass()
+class _Rectangle:
+    left: int
+    top: int
+    right: int
+    bottom: int
+
+
+class SimulatedElement:
+    """UI Automation element. Name may be callable to follow simulated state"""
+
+    def __init__(self, control_type: int, name="", rectangle: Optional[_Rectangle] = None, child=None,
+                 number: int = -1):
+        self.CurrentControlType = control_type
+        self.CurrentBoundingRectangle = rectangle or _Rectangle(0, 0, 0, 0)
+        self.child = child
+        self.number = number
+        self._name = name
+
+    @property
+    def CurrentName(self) -> str:
+        return self._name() if callable(self._name) else self._name
+
+
+class SimulatedDesktop:
+    """Simulated Teams client shared by fake backends. Window of meeting appears `window_delay` seconds after its URL
+    is opened. Controls are laid out by meeting number: x = 2 * number + 1, y = 1 (Join), 3 (camera), 5 (microphone),
+    7 (Leave). With `cold_start` Teams client is closed at first, it is responsive `cold_start` seconds after launch
+    and URLs opened meanwhile are processed only then
+    """
+
+    hwnd_base = 1000
+
+    def __init__(self, clock: VirtualClock, window_delay: float = 3.0, cold_start: float = 0.0):
+        self.clock = clock
+        self.window_delay = window_delay
+        self.cold_start = cold_start
+        self.launched = None if cold_start else float("-inf")
+        self.cold_joins = 0
+        self.numbers: Dict[str, int] = dict()
+        self.windows: Dict[str, int] = dict()
+        self.states: Dict[int, List[str]] = dict()
+        self.opened: Dict[int, float] = dict()
+        self.pressed: Dict[int, float] = dict()
+        self.left: Dict[int, float] = dict()
+        self.titles: Dict[int, str] = dict()
+        self._lock = threading.Lock()
+
+    def register(self, number: int, subject: str, url: str, camera: str, mic: str):
+        self.numbers[join_thread_id(url)] = number
+        self.windows[f"{subject} | Microsoft Teams"] = number
+        self.titles[number] = f"{subject} | Microsoft Teams"
+        self.states[number] = [camera, mic]
+
+    def launch(self):
+        with self._lock:
+            if self.launched is None:
+                self.launched = self.clock.time()
+
+    def ready(self) -> bool:
+        return self.launched is not None and self.clock.time() >= self.launched + self.cold_start
+
+    def open(self, url: str) -> bool:
+        number = self.numbers.get(join_thread_id(url))
+        if number is None:
+            return False
+        if not self.ready():
+            # Cold start on join critical path
+            self.cold_joins += 1
+            self.launch()
+        with self._lock:
+            self.opened.setdefault(number, max(self.clock.time(), self.launched + self.cold_start))
+        return True
+
+    def window(self, name: str) -> List[int]:
+        number = self.windows.get(name)
+        opened = self.opened.get(number)
+        if opened is None or self.clock.time() < opened + self.window_delay:
+            return list()
+        return [self.hwnd_base + number]
+
+    def join_name(self, number: int) -> str:
+        camera, mic = self.states[number]
+        return f"Join With Camera {camera} Mic {mic}"
+
+    def click(self, x: int, y: int):
+        number = (x - 1) // 2
+        with self._lock:
+            if y == 1:
+                self.pressed.setdefault(number, self.clock.time())
+            elif y in (3, 5):
+                states = self.states[number]
+                index = (y - 3) // 2
+                states[index] = "on" if states[index] == "off" else "off"
+            elif y == 7:
+                self.left.setdefault(number, self.clock.time())
+
+
+class SimulatedCalendar(CalendarSource):
+    """Calendar with generated events. Opening URL opens simulated Teams window. Join latencies go to in-memory
+    history, so hand-off lead is learned as in real runs. Warm-up stays `time_before` ahead, report measures
+    warm-up accuracy against it
+    """
+
+    # Progress bar ticks would only add clock events
+    progress_interval = 24 * 3600
+
+    def __init__(self, events: List[DataStorage], desktop: SimulatedDesktop, time_before: int = 3 * 60):
+        super().__init__(time_before=time_before, latency_history=JoinLatencyHistory(None))
+        self.events = events
+        self.desktop = desktop
+
+    def lead_time(self, meet_object: DataStorage, join_before: float = 0) -> float:
+        return self.start_before
+
+    def read_events(self) -> Optional[List[DataStorage]]:
+        return list(self.events)
+
+    def _open_teams_meet_via_url(self, url: str) -> bool:
+        return self.desktop.open(url)
+
+
+class SimulatedWindows:
+    """EnumActiveWindows replacement"""
+
+    def __init__(self, desktop: SimulatedDesktop):
+        self.desktop = desktop
+
+    def find_teams_window(self, search_pattern, matcher=None) -> List[int]:
+        return self.desktop.window(search_pattern.subject_name)
+
+    def window_title(self, hwnd: int) -> str:
+        return self.desktop.titles.get(hwnd - SimulatedDesktop.hwnd_base, "")
+
+    def activate_window(self, hwnd: int):
+        pass
+
+
+class SimulatedTeamsSupervisor(TeamsSupervisor):
+    """TeamsSupervisor over simulated Teams client"""
+
+    def __init__(self, desktop: SimulatedDesktop, **kwargs):
+        super().__init__(enum=None, **kwargs)
+        self.desktop = desktop
+
+    def teams_windows(self) -> List[int]:
+        return [SimulatedDesktop.hwnd_base - 1] if self.desktop.launched is not None else list()
+
+    def responsive(self, window_handler) -> bool:
+        return self.desktop.ready()
+
+    def launch(self) -> bool:
+        self.desktop.launch()
+        return True
+
+
+class _Walker:
+    @staticmethod
+    def GetFirstChildElement(element):
+        return element.child
+
+
+class SimulatedUIAutomation(IUIAutomation):
+    """IUIAutomation over simulated tree. State logic (camera/microphone state, coordinates) is inherited, every tree
+    query costs `uia_delay` virtual seconds
+    """
+
+    def __init__(self, desktop: SimulatedDesktop, camera: str, mic: str, uia_delay: float = 0.2):
+        # No COM: tree is served by simulated desktop
+        self.desktop = desktop
+        self.uia_delay = uia_delay
+        self.control_view_walker = self.raw_view_walker = _Walker()
+        self.root_element = None
+        self.join_button = None
+        self.microphone_control = None
+        self.camera_control = None
+        self.cam_state = None
+        self.mic_state = None
+        self.preferred_cam_state = camera.lower()
+        self.preferred_mic_state = mic.lower()
+
+    def child_siblings_from_root_element(self, walker, element, enum_wind: List[int], search_pattern):
+        self.desktop.clock.sleep(self.uia_delay)
+        number = enum_wind[-1] - SimulatedDesktop.hwnd_base
+        document = SimulatedElement(ControlType.DocumentControlType, number=number)
+        return [SimulatedElement(ControlType.PaneControlType, child=document, number=number)]
+
+    def window_elements(self, window_handlers: List[int]) -> List:
+        return self.child_siblings_from_root_element(None, None, enum_wind=window_handlers, search_pattern=None)
+
+    def region_control_siblings_from_document_control(self, walker, element, search_pattern):
+        self.desktop.clock.sleep(self.uia_delay)
+        number = element.number
+        self.join_button = SimulatedElement(BUTTON_CONTROL_TYPE, name=partial(self.desktop.join_name, number),
+                                            rectangle=_Rectangle(2 * number, 0, 2 * number + 2, 2), number=number)
+        return [SimulatedElement(ControlType.PaneControlType, number=number) for _ in range(2)]
+
+    def get_microphone_control_type(self, walker, elements: List, search_pattern):
+        self.desktop.clock.sleep(self.uia_delay)
+        number = elements[0].number
+        self.microphone_control = SimulatedElement(BUTTON_CONTROL_TYPE, name="Microphone",
+                                                   rectangle=_Rectangle(2 * number, 4, 2 * number + 2, 6))
+
+    @staticmethod
+    def get_toolbar_control_type(walker, elements: List, search_pattern):
+        return elements[0]
+
+    def get_camera_control_type(self, walker, elements, search_pattern):
+        self.desktop.clock.sleep(self.uia_delay)
+        number = elements.number
+        self.camera_control = SimulatedElement(BUTTON_CONTROL_TYPE, name="Camera",
+                                               rectangle=_Rectangle(2 * number, 2, 2 * number + 2, 4))
+
+    def in_call_control(self, walker, window_handlers: List[int], search_pattern, max_elements: int = 3000):
+        self.desktop.clock.sleep(self.uia_delay)
+        number = window_handlers[-1] - SimulatedDesktop.hwnd_base
+        if number in self.desktop.pressed and number not in self.desktop.left:
+            return SimulatedElement(BUTTON_CONTROL_TYPE, name="Leave", number=number,
+                                    rectangle=_Rectangle(2 * number, 6, 2 * number + 2, 8))
+        return None
+
+
+class SimulatedMouse:
+    """MouseEvents replacement. Clicks land on simulated desktop after `hold`"""
+
+    def __init__(self, desktop: SimulatedDesktop):
+        self.desktop = desktop
+
+    def left_button_click(self, dx: int, dy: int, hold: float = 0.5, settle: float = 0.5):
+        self.desktop.clock.sleep(hold)
+        self.desktop.click(dx, dy)
+        self.desktop.clock.sleep(settle)
+
+    def block_input(self):
+        pass
+
+    def unblock_input(self):
+        pass
+
+
+def _percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    values = sorted(values)
+    pick = lambda share: values[min(len(values) - 1, int(share * len(values)))]
+    return f"p50 {pick(0.5) * 1000:.0f} ms, p95 {pick(0.95) * 1000:.0f} ms, max {values[-1] * 1000:.0f} ms"
+
+
+def _peak(events: List[Tuple[float, int]]) -> int:
+    """Largest running total of (instant, change) events. All changes of one instant are applied together"""
+
+    events = sorted(events)
+    total = peak = 0
+    for index, (instant, change) in enumerate(events):
+        total += change
+        if index + 1 == len(events) or events[index + 1][0] != instant:
+            peak = max(peak, total)
+    return peak
+
+
+class Simulation:
+    """Generate meetings, play them on virtual clock through TeamsRunner.run_meetings and report scheduling quality"""
+
+    def __init__(self, days: int = 1, meetings_per_day: int = 200, start_before: int = 3 * 60,
+                 join_before: float = 0, window_delay: float = 3.0, uia_delay: float = 0.2, mic: str = "off",
+                 camera: str = "off", duplicate_rate: float = 0.0, working_hours: tuple = (8, 18), seed: int = 0,
+                 duration: int = 30, handoff_gap: float = 0, cold_start: float = 0.0, supervise: bool = False,
+                 resolution: float = 0.01, settle: float = 0.0002):
+        self.days = days
+        self.meetings_per_day = meetings_per_day
+        self.start_before = start_before
+        self.join_before = join_before
+        self.window_delay = window_delay
+        self.uia_delay = uia_delay
+        self.mic = mic
+        self.camera = camera
+        self.duplicate_rate = duplicate_rate
+        self.working_hours = working_hours
+        self.duration = duration
+        self.handoff_gap = handoff_gap
+        self.supervise = supervise
+        self.random = random.Random(seed)
+        self.begin = datetime.datetime.combine(datetime.date.today(), datetime.time())
+        self.clock = VirtualClock(start=self.begin.timestamp(), resolution=resolution, settle=settle)
+        self.desktop = SimulatedDesktop(self.clock, window_delay=window_delay, cold_start=cold_start)
+        self.started: Dict[int, float] = dict()
+        self.handoff_gaps: Dict[int, float] = dict()
+        self.threads = 0
+        self.handoffs = 0
+        self._lock = threading.Lock()
+        random.seed(seed)
+
+    def events(self) -> List[DataStorage]:
+        """Meetings of `duration` minutes on 5 minute grid inside working hours. Some are duplicated as forwarded
+        copies
+        """
+
+        first, last = self.working_hours
+        slots = (last - first) * 12
+        events = list()
+        for day in range(self.days):
+            day_start = self.begin + datetime.timedelta(days=day, hours=first)
+            for _ in range(self.meetings_per_day):
+                number = len(self.desktop.states)
+                subject = f"Simulated meeting {number:06d}"
+                url = f"https://teams.microsoft.com/l/meetup-join/19%3ameeting_{number:06d}%40thread.v2/0"
+                start = day_start + datetime.timedelta(minutes=5 * self.random.randrange(slots))
+                self.desktop.register(number, subject, url, camera=self.random.choice(("on", "off")),
+                                      mic=self.random.choice(("on", "off")))
+                copies = 2 if self.random.random() < self.duplicate_rate else 1
+                if copies > 1:
+                    self.desktop.windows[f"FW: {subject} | Microsoft Teams"] = number
+                for copy in range(copies):
+                    event = DataStorage()
+                    for name, value in dict(Start=start, End=start + datetime.timedelta(minutes=self.duration),
+                                            Subject=subject if not copy else f"FW: {subject}",
+                                            GetOrganizer="simulation", Location="", Properties=[url],
+                                            GlobalAppointmentID=f"SIM{number:06d}", Display=lambda: None).items():
+                        setattr(event, name, value)
+                    events.append(event)
+        return events
+
+    def _tracked_main(self, meeting, **kwargs):
+        """TeamsRunner.main as clock participant. Records when executor actually started the meeting"""
+
+        _, _, search_pattern, _ = meeting
+        with self.clock.participant():
+            with self._lock:
+                self.started[self.desktop.windows[search_pattern.subject_name]] = self.clock.time()
+                self.threads = max(self.threads, threading.active_count())
+            joined, meeting = TeamsRunner.main(meeting, **kwargs)
+            # Join state is dropped once the chain handed it on. Gap is taken now
+            join_state = getattr(meeting[3], "JoinState", None)
+            if joined and join_state is not None and join_state.handoff:
+                with self._lock:
+                    self.handoff_gaps[self.desktop.windows[search_pattern.subject_name]] = \
+                        join_state.timings["join_pressed"] - join_state.timings["left"]
+            return joined, meeting
+
+    def run(self) -> dict:
+        """Play the schedule. Returns report"""
+
+        events = self.events()
+        calendar = SimulatedCalendar(events, self.desktop, time_before=self.start_before)
+        iui_auto = partial(SimulatedUIAutomation, self.desktop, camera=self.camera, mic=self.mic,
+                           uia_delay=self.uia_delay)
+        duplicates = metrics.snapshot()["counters"].get("meetings.duplicates", 0)
+        self.handoffs = metrics.snapshot()["counters"].get("handoff.success", 0)
+        supervisor = SimulatedTeamsSupervisor(self.desktop) if self.supervise else None
+        tracemalloc.start()
+        previous = install_clock(self.clock)
+        real_start = time.perf_counter()
+        try:
+            with warnings.catch_warnings(), open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+                warnings.simplefilter("ignore")
+                meetings = calendar.available_meetings()
+                submitted = self.clock.time()
+                _, results = TeamsRunner.run_meetings(meetings, enum=SimulatedWindows(self.desktop),
+                                                      iui_auto=iui_auto, outlook=calendar,
+                                                      mouse=SimulatedMouse(self.desktop), join_before=self.join_before,
+                                                      runner=self._tracked_main, handoff_gap=self.handoff_gap,
+                                                      supervisor=supervisor)
+        finally:
+            install_clock(previous)
+            real_seconds = time.perf_counter() - real_start
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.clock.close()
+        report = self.report(meetings, results, real_seconds, peak_memory, submitted)
+        report["duplicates"] = metrics.snapshot()["counters"].get("meetings.duplicates", 0) - duplicates
+        return report
+
+    def report(self, meetings: List, results: List, real_seconds: float, peak_memory: int, submitted: float) -> dict:
+        """Wake-up accuracy, queue depth, threads and memory. Meetings are submitted to run_meetings at `submitted`"""
+
+        warm_up_lateness, join_lateness, gaps = list(), list(), list()
+        due_events, queue_events = list(), list()
+        for _, _, search_pattern, meet_object in meetings:
+            number = self.desktop.windows[search_pattern.subject_name]
+            warm_up = meet_object.StartTimestamp - self.start_before
+            if number in self.handoff_gaps:
+                # URL of handed off meeting opens only after previous call is left
+                gaps.append(self.handoff_gaps[number])
+            elif number in self.desktop.opened:
+                warm_up_lateness.append(self.desktop.opened[number] - warm_up)
+            if number in self.desktop.pressed:
+                join_lateness.append(self.desktop.pressed[number] - (meet_object.StartTimestamp - self.join_before))
+            started = self.started.get(number)
+            # Queue: meeting is submitted, but no pool thread has started it yet. Never started ones stay queued
+            queue_events.append((submitted, 1))
+            if started is not None:
+                queue_events.append((started, -1))
+            # Backlog: meeting warm-up is due, but executor has not started it yet
+            if started is not None and started > warm_up:
+                due_events.append((warm_up, 1))
+                due_events.append((started, -1))
+        max_backlog = _peak(due_events)
+        max_queue = _peak(queue_events)
+
+        virtual_seconds = max(list(self.desktop.pressed.values()) + [self.begin.timestamp()]) - self.begin.timestamp()
+        counters = metrics.snapshot()["counters"]
+        return dict(meetings=len(self.desktop.states), scheduled=len(meetings),
+                    joined=sum(1 for *_, joined in results if joined),
+                    handoffs=counters.get("handoff.success", 0) - self.handoffs, handoff_gap=_percentiles(gaps),
+                    cold_start_on_join=self.desktop.cold_joins,
+                    missed=len(meetings) - len(join_lateness),
+                    late_joins=sum(1 for lateness in join_lateness if lateness > 1.0),
+                    warm_up_lateness=_percentiles(warm_up_lateness), join_lateness=_percentiles(join_lateness),
+                    max_queue_depth=max_queue, max_due_backlog=max_backlog, max_threads=self.threads,
+                    peak_memory_mb=round(peak_memory / 2 ** 20, 1), clock_advances=self.clock.advances,
+                    virtual_hours=round(virtual_seconds / 3600, 1), real_seconds=round(real_seconds, 1))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Teams AUTO-JOIN scheduler simulation on virtual clock")
+    parser.add_argument("--days", type=int, default=1, help="Simulated days")
+    parser.add_argument("--meetings_per_day", type=int, default=200)
+    parser.add_argument("--start_before", type=int, default=3 * 60, help="Warm-up lead time (seconds)")
+    parser.add_argument("--join_before", type=float, default=0)
+    parser.add_argument("--window_delay", type=float, default=3.0,
+                        help="Seconds until Teams window appears after URL is opened")
+    parser.add_argument("--uia_delay", type=float, default=0.2, help="Seconds per UI Automation tree query")
+    parser.add_argument("--mic", type=str, default="off")
+    parser.add_argument("--camera", type=str, default="off")
+    parser.add_argument("--duplicate_rate", type=float, default=0.05,
+                        help="Share of meetings which also appear as forwarded copy")
+    parser.add_argument("--duration", type=int, default=30, help="Meeting duration (minutes)")
+    parser.add_argument("--handoff_gap", type=float, default=0,
+                        help="Hand off back-to-back meetings which start at most this many seconds after previous end")
+    parser.add_argument("--cold_start", type=float, default=0,
+                        help="Teams client is closed at first and starts this many seconds after launch")
+    parser.add_argument("--supervise", action="store_true", help="Start Teams ahead of warm-ups with TeamsSupervisor")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--settle", type=float, default=0.0002,
+                        help="Real seconds without clock activity before virtual time moves")
+    parser.add_argument("--profile", type=str, default=None,
+                        help=f"Profile stages: 'all' or comma separated list of {', '.join(PROFILE_STAGES)}")
+    parser.add_argument("--profile_mode", type=str, default="deterministic", choices=("deterministic", "sampling"))
+    parser.add_argument("--profile_dir", type=str, default="profiles")
+
+    arguments = parser.parse_args()
+    profiler = None
+    if arguments.profile:
+        profile_stages = dict(PROFILE_STAGES, uia=(SimulatedUIAutomation, PROFILE_STAGES["uia"][1]))
+        profiler = setup_profiler(arguments.profile, arguments.profile_mode, arguments.profile_dir, False,
+                                  profile_stages=profile_stages)
+    simulation = Simulation(days=arguments.days, meetings_per_day=arguments.meetings_per_day,
+                            start_before=arguments.start_before, join_before=arguments.join_before,
+                            window_delay=arguments.window_delay, uia_delay=arguments.uia_delay, mic=arguments.mic,
+                            camera=arguments.camera, duplicate_rate=arguments.duplicate_rate, seed=arguments.seed,
+                            duration=arguments.duration, handoff_gap=arguments.handoff_gap,
+                            cold_start=arguments.cold_start, supervise=arguments.supervise, settle=arguments.settle)
+    report = simulation.run()
+    if profiler:
+        profiler.stop()
+    for name, value in report.items():
+        print(f"{name}: {value}")
@@ -0,0 +1,188 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from coordinator import (Coordinator, CoordinatorServer, FakeJoiner, LeaseToken, Meeting, WorkerAgent,
+                         calendar_meetings, fake_meetings)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture()
+def server():
+    servers = list()
+
+    def start(coordinator):
+        instance = CoordinatorServer(("127.0.0.1", 0), coordinator)
+        threading.Thread(target=instance.serve_forever, daemon=True).start()
+        servers.append(instance)
+        return instance.server_address
+
+    yield start
+    for instance in servers:
+        instance.shutdown()
+        instance.server_close()
+
+
+def _meeting(key, start):
+    return Meeting(key=key, subject=key, url=f"//teams.microsoft.com/l/meetup-join/{key}", start=start)
+
+
+def test_expired_lease_is_revoked_and_reassigned():
+    clock = _Clock()
+    coordinator = Coordinator(lease=5, clock=clock)
+    coordinator.merge([_meeting("m1", clock.now + 60)])
+    for worker in ("a", "b"):
+        coordinator.handle(dict(type="hello", worker=worker, capacity=1))
+
+    assert coordinator.handle(dict(type="request", worker="a"))["type"] == "assign"
+    clock.now += 6
+    coordinator.handle(dict(type="heartbeat", worker="b", held=[]))
+    coordinator.reap()
+    assert coordinator.handle(dict(type="request", worker="b"))["meeting"]["key"] == "m1"
+    assert coordinator.handle(dict(type="heartbeat", worker="a", held=["m1"]))["revoked"] == ["m1"]
+
+
+def test_late_success_of_previous_holder_revokes_current_holder():
+    clock = _Clock()
+    coordinator = Coordinator(lease=5, clock=clock)
+    coordinator.merge([_meeting("m1", clock.now + 60)])
+    for worker in ("a", "b"):
+        coordinator.handle(dict(type="hello", worker=worker, capacity=1))
+    coordinator.handle(dict(type="request", worker="a"))
+    clock.now += 6
+    coordinator.handle(dict(type="heartbeat", worker="b", held=[]))
+    coordinator.reap()
+    coordinator.handle(dict(type="request", worker="b"))
+
+    coordinator.handle(dict(type="result", worker="a", key="m1", success=True))
+    assert coordinator.summary() == {"done": 1}
+    assert coordinator.handle(dict(type="heartbeat", worker="b", held=["m1"]))["revoked"] == ["m1"]
+
+
+def test_same_url_meetings_of_one_day_are_scheduled_separately():
+    class _Occurrence:
+        def __init__(self, start):
+            self.Subject = "Stand-up"
+            self.StartTimestamp = start
+            self.GetOrganizer = "Organizer"
+            self.Location = ""
+
+    class _Calendar:
+        # Recurring series (or personal meeting room) link: every occurrence has the same join URL
+        def available_meetings(self):
+            url = "https://teams.microsoft.com/l/meetup-join/series"
+            return [(0, url, None, _Occurrence(clock.now + 60)), (0, url, None, _Occurrence(clock.now + 3660))]
+
+    clock = _Clock()
+    coordinator = Coordinator(lease=5, clock=clock, dispatch_ahead=4000)
+    assert coordinator.merge(calendar_meetings(_Calendar())) == 2
+    coordinator.handle(dict(type="hello", worker="a", capacity=2))
+    first = coordinator.handle(dict(type="request", worker="a"))["meeting"]
+    second = coordinator.handle(dict(type="request", worker="a"))["meeting"]
+    assert first["url"] == second["url"] and second["start"] - first["start"] == 3600
+
+
+def test_join_is_not_pressed_on_cancelled_lease(tmp_path):
+    log = tmp_path / "presses"
+    joiner = FakeJoiner(join_seconds=0.05, lead=0, log=str(log))
+    meeting = _meeting("m1", time.time())
+
+    revoked = LeaseToken(10, time.monotonic())
+    revoked.revoke()
+    assert not joiner(meeting, revoked)
+    expired = LeaseToken(0.01, time.monotonic())
+    assert not joiner(meeting, expired)
+    assert not log.exists()
+
+    assert joiner(meeting, LeaseToken(10, time.monotonic()))
+    assert log.read_text().split() == ["m1"]
+
+
+def test_handler_drops_non_object_messages(server):
+    address = server(Coordinator())
+    with socket.create_connection(address, timeout=5) as connection:
+        reader = connection.makefile("r")
+        for line in ("[1, 2]", "42", "\"hello\"", "{broken"):
+            connection.sendall((line + "\n").encode())
+            assert json.loads(reader.readline())["type"] == "error"
+        connection.sendall((json.dumps(dict(type="hello", worker="w", capacity=1)) + "\n").encode())
+        assert json.loads(reader.readline())["type"] == "welcome"
+
+
+def test_worker_gives_up_after_reconnect_cap():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        address = probe.getsockname()
+    agent = WorkerAgent(address, FakeJoiner(), reconnect=0.01, max_reconnects=3)
+    with pytest.warns(UserWarning):
+        agent.run()
+    assert agent._failures == 3
+
+
+def test_worker_calendars_are_merged_and_worker_stops_when_finished(server):
+    coordinator = Coordinator(lease=2, heartbeat=0.1, min_calendars=1)
+    address = server(coordinator)
+    meetings = fake_meetings(3, spacing=0.1, first_in=0.2)
+    # Forwarded copy of the same meeting on worker calendar is scheduled once
+    meetings.append(Meeting(key="copy", subject="FW: copy", url=meetings[0].url, start=meetings[0].start))
+    agent = WorkerAgent(address, FakeJoiner(join_seconds=0.01, lead=0), worker_id="box", capacity=2,
+                        calendar=lambda: meetings)
+    worker = threading.Thread(target=agent.run)
+    worker.start()
+    worker.join(timeout=20)
+
+    assert not worker.is_alive()
+    assert coordinator.summary() == {"done": 3}
+    assert sorted(subject for subject, _ in agent.results) == sorted(meeting.subject for meeting in meetings[:3])
+
+
+def test_killed_worker_meetings_are_reassigned(server, tmp_path):
+    coordinator = Coordinator(lease=1.5, heartbeat=0.2)
+    coordinator.merge(fake_meetings(12, spacing=0.5, first_in=2.0))
+    host, port = server(coordinator)
+    log = tmp_path / "presses"
+    workers = {worker_id: subprocess.Popen(
+        [sys.executable, "coordinator.py", "worker", "--address", f"{host}:{port}", "--backend", "fake",
+         "--worker_id", worker_id, "--capacity", "2", "--fake_log", str(log)], cwd=ROOT,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) for worker_id in ("w0", "w1", "w2")}
+    try:
+        deadline = time.time() + 10
+        while not (coordinator.workers.get("w0") and coordinator.workers["w0"].held) and time.time() < deadline:
+            time.sleep(0.05)
+        assert coordinator.workers["w0"].held
+        workers["w0"].send_signal(signal.SIGKILL)
+
+        deadline = time.time() + 30
+        while not coordinator.finished() and time.time() < deadline:
+            coordinator.reap()
+            time.sleep(0.1)
+        assert coordinator.summary() == {"done": 12}
+        for worker_id in ("w1", "w2"):
+            # Workers stop on 'finished' reply
+            assert workers[worker_id].wait(timeout=10) == 0
+    finally:
+        for process in workers.values():
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+
+    presses = [line.split() for line in log.read_text().splitlines()]
+    survivors = [key for key, worker_id in presses if worker_id != "w0"]
+    assert len(survivors) == len(set(survivors))
+    assert {key for key, _ in presses} == {f"fake-{number}" for number in range(12)}
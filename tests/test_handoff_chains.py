@@ -0,0 +1,94 @@
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("win32com")
+
+import auto_join_teams_meeting as auto_join  # noqa: E402
+
+
+class Calendar(auto_join.CalendarSource):
+    def read_events(self):
+        return list()
+
+
+def _meeting(subject, start, duration):
+    meet_object = auto_join.DataStorage()
+    meet_object.Subject = subject
+    meet_object.GetOrganizer = "Organizer"
+    meet_object.StartTimestamp = start
+    meet_object.EndTimestamp = start + duration
+    search_pattern = auto_join.SearchPattern()
+    search_pattern.add_name(subject)
+    return start - time.time(), f"https://teams.microsoft.com/l/meetup-join/{subject}", search_pattern, meet_object
+
+
+def test_long_chains_do_not_delay_overlapping_meeting():
+    # More back-to-back chains than the default pool has threads, plus one unrelated meeting in the middle of them
+    now = time.time()
+    meetings = list()
+    for number in range(40):
+        meetings += [_meeting(f"Chain {number} part 1", now + 0.2, 0.3),
+                     _meeting(f"Chain {number} part 2", now + 0.5, 0.3),
+                     _meeting(f"Chain {number} part 3", now + 0.8, 0.3)]
+    meetings.append(_meeting("Unrelated", now + 0.35, 0.3))
+    meetings.sort(key=lambda meeting: meeting[3].StartTimestamp)
+    joined_at = dict()
+    lock = threading.Lock()
+
+    def runner(meeting, previous=None, **kwargs):
+        meet_object = meeting[3]
+        time.sleep(max(0.0, meet_object.StartTimestamp - time.time()))
+        with lock:
+            joined_at[meet_object.Subject] = time.time()
+        setattr(meet_object, "JoinState", auto_join.DataStorage())
+        return True, meeting
+
+    calendar = Calendar(time_before=0)
+    ran, results = auto_join.TeamsRunner.run_meetings(meetings, enum=None, iui_auto=None, outlook=calendar, mouse=None,
+                                                      runner=runner, handoff_gap=60)
+    assert ran and len(results) == len(meetings) and all(result for *_, result in results)
+    assert joined_at["Unrelated"] - (now + 0.35) < 0.15
+
+
+def test_concurrent_chains_counts_overlapping_chains():
+    now = time.time()
+    chains = auto_join.TeamsRunner.handoff_chains(
+        [_meeting("A1", now, 60), _meeting("B", now + 30, 60), _meeting("A2", now + 60, 60),
+         _meeting("C", now + 10_000, 60)], handoff_gap=60)
+    assert [[meeting[3].Subject for meeting in chain] for chain in chains] == [["A1", "A2"], ["B"], ["C"]]
+    assert auto_join.TeamsRunner.concurrent_chains(chains, lead_time=0) == 2
+
+
+def test_chain_keeps_only_previous_join_state():
+    now = time.time()
+    chain = [_meeting(f"Part {number}", now + number * 0.01, 0.01) for number in range(3)]
+    received = list()
+
+    def runner(meeting, previous=None, **kwargs):
+        received.append(previous)
+        state = auto_join.DataStorage()
+        state.subject = meeting[3].Subject
+        setattr(meeting[3], "JoinState", state)
+        return True, meeting
+
+    results = auto_join.TeamsRunner.run_chain(chain, runner)
+    assert [state.subject if state else None for state in received] == [None, "Part 0", "Part 1"]
+    assert not any(hasattr(meeting[3], "JoinState") for _, meeting in results)
+
+
+def test_handoff_lead_is_learned_from_handoff_records():
+    history = auto_join.JoinLatencyHistory(None, min_samples=3)
+    calendar = Calendar(time_before=180, latency_history=history)
+    assert calendar.handoff_lead(default=10) == 10
+    for latency in (3.0, 3.5, 4.0):
+        history.record(latency, start=time.time(), handoff=True)
+    assert calendar.handoff_lead(default=10) == pytest.approx(4.0 * history.safety)
+    # Cold joins are estimated separately
+    assert history.lead_time() is None
+
+    fast = auto_join.JoinLatencyHistory(None, min_samples=3)
+    for latency in (0.5, 0.5, 0.5):
+        fast.record(latency, start=time.time(), handoff=True)
+    assert fast.lead_time(handoff=True) == fast.handoff_minimum
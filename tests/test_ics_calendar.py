@@ -0,0 +1,90 @@
+import datetime
+
+import pytest
+
+import ics_calendar
+
+BEGIN = datetime.datetime(2026, 10, 1)
+END = datetime.datetime(2027, 12, 31)
+
+
+def _expand(dtstart, rrule, begin=BEGIN, end=END):
+    return list(ics_calendar.expand_rrule(dtstart, rrule, begin, end))
+
+
+def test_monthly_ordinal_byday():
+    occurrences = _expand(datetime.datetime(2026, 10, 13, 10), "FREQ=MONTHLY;BYDAY=2TU;COUNT=3")
+    assert occurrences == [datetime.datetime(2026, 10, 13, 10), datetime.datetime(2026, 11, 10, 10),
+                           datetime.datetime(2026, 12, 8, 10)]
+
+
+def test_monthly_last_weekday_and_bysetpos():
+    last_friday = _expand(datetime.datetime(2026, 10, 30, 9), "FREQ=MONTHLY;BYDAY=-1FR;COUNT=2")
+    assert last_friday == [datetime.datetime(2026, 10, 30, 9), datetime.datetime(2026, 11, 27, 9)]
+    last_workday = _expand(datetime.datetime(2026, 10, 30, 9), "FREQ=MONTHLY;BYDAY=MO,TU,WE,TH,FR;BYSETPOS=-1;COUNT=3")
+    assert last_workday == [datetime.datetime(2026, 10, 30, 9), datetime.datetime(2026, 11, 30, 9),
+                            datetime.datetime(2026, 12, 31, 9)]
+
+
+def test_monthly_bymonthday():
+    occurrences = _expand(datetime.datetime(2026, 10, 15, 14), "FREQ=MONTHLY;BYMONTHDAY=1,15;COUNT=4")
+    assert occurrences == [datetime.datetime(2026, 10, 15, 14), datetime.datetime(2026, 11, 1, 14),
+                           datetime.datetime(2026, 11, 15, 14), datetime.datetime(2026, 12, 1, 14)]
+    last_day = _expand(datetime.datetime(2027, 1, 31, 8), "FREQ=MONTHLY;BYMONTHDAY=-1;COUNT=3")
+    assert last_day == [datetime.datetime(2027, 1, 31, 8), datetime.datetime(2027, 2, 28, 8),
+                        datetime.datetime(2027, 3, 31, 8)]
+
+
+def test_monthly_without_by_parts_skips_missing_days():
+    occurrences = _expand(datetime.datetime(2026, 10, 31, 8), "FREQ=MONTHLY;COUNT=3")
+    assert occurrences == [datetime.datetime(2026, 10, 31, 8), datetime.datetime(2026, 12, 31, 8),
+                           datetime.datetime(2027, 1, 31, 8)]
+
+
+def test_yearly_bymonth_ordinal_byday():
+    occurrences = _expand(datetime.datetime(2026, 11, 26, 12), "FREQ=YEARLY;BYMONTH=11;BYDAY=4TH")
+    assert occurrences == [datetime.datetime(2026, 11, 26, 12), datetime.datetime(2027, 11, 25, 12)]
+
+
+def test_window_and_until_bound_monthly_rule():
+    occurrences = _expand(datetime.datetime(2020, 1, 14, 10), "FREQ=MONTHLY;BYDAY=2TU;UNTIL=20261231T000000",
+                          begin=datetime.datetime(2026, 11, 1))
+    assert occurrences == [datetime.datetime(2026, 11, 10, 10), datetime.datetime(2026, 12, 8, 10)]
+
+
+def test_unsupported_rule_is_skipped_with_warning():
+    with pytest.warns(UserWarning, match="BYWEEKNO"):
+        assert _expand(datetime.datetime(2026, 10, 13, 10), "FREQ=YEARLY;BYWEEKNO=20;BYDAY=MO") == []
+
+
+@pytest.mark.parametrize("week_start, expected_days", [("MO", [(10, 13), (10, 18), (10, 27), (11, 1)]),
+                                                       ("SU", [(10, 13), (10, 25), (10, 27), (11, 8)])])
+def test_weekly_interval_honours_wkst(week_start, expected_days):
+    occurrences = _expand(datetime.datetime(2026, 10, 13, 10),
+                          f"FREQ=WEEKLY;INTERVAL=2;COUNT=4;BYDAY=TU,SU;WKST={week_start}")
+    assert occurrences == [datetime.datetime(2026, month, day, 10) for month, day in expected_days]
+
+
+def test_monthly_and_yearly_rules_jump_to_window():
+    begin = datetime.datetime(2026, 11, 1)
+    monthly = _expand(datetime.datetime(1900, 1, 9, 10), "FREQ=MONTHLY;INTERVAL=2;BYDAY=2TU", begin=begin,
+                      end=datetime.datetime(2027, 3, 1))
+    assert monthly == [datetime.datetime(2026, 11, 10, 10), datetime.datetime(2027, 1, 12, 10)]
+    yearly = _expand(datetime.datetime(1900, 11, 22, 12), "FREQ=YEARLY;BYMONTH=11;BYDAY=4TH", begin=begin)
+    assert yearly == [datetime.datetime(2026, 11, 26, 12), datetime.datetime(2027, 11, 25, 12)]
+
+
+def test_override_moved_into_window_inherits_series_properties():
+    url = "https://teams.microsoft.com/l/meetup-join/19%3ameeting_series"
+    lines = ["BEGIN:VCALENDAR",
+             "BEGIN:VEVENT", "UID:series", "SUMMARY:Weekly sync", "LOCATION:Room 1",
+             f"X-MICROSOFT-SKYPETEAMSMEETINGURL:{url}",
+             "DTSTART:20261005T100000", "DTEND:20261005T103000", "RRULE:FREQ=WEEKLY;COUNT=2", "END:VEVENT",
+             # Second occurrence (12th) moved to the 15th, only the changed time is exported
+             "BEGIN:VEVENT", "UID:series", "RECURRENCE-ID:20261012T100000", "DTSTART:20261015T100000",
+             "DTEND:20261015T103000", "END:VEVENT",
+             "END:VCALENDAR"]
+    events = ics_calendar.events_in_window(lines, datetime.datetime(2026, 10, 14), datetime.datetime(2026, 10, 16))
+    assert len(events) == 1
+    assert (events[0].start, events[0].subject, events[0].location, events[0].join_url) == (
+        datetime.datetime(2026, 10, 15, 10), "Weekly sync", "Room 1", url)
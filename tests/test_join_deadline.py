@@ -0,0 +1,47 @@
+import pytest
+
+pytest.importorskip("win32com")
+
+import auto_join_teams_meeting as auto_join  # noqa: E402
+
+
+class ManualClock(auto_join.SystemClock):
+    """Clock which only moves when the test sleeps"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+
+@pytest.fixture()
+def manual_clock():
+    manual = ManualClock()
+    previous = auto_join.install_clock(manual)
+    yield manual
+    auto_join.install_clock(previous)
+
+
+@pytest.mark.parametrize("target_in, expected_in", [(5, 20), (50, 50), (-10, 20)])
+def test_stage_retry_deadline_follows_budget_and_time_to_target(manual_clock, target_in, expected_in):
+    now = manual_clock.now
+    deadline = auto_join.JoinDeadline(target=now + target_in, hard=now + target_in + 120)
+    with auto_join.RetryPolicy.deadline_scope(deadline.hard):
+        with deadline.stage("controls", 20):
+            assert auto_join.RetryPolicy.current_deadline() == now + expected_in
+
+
+def test_stage_retries_stop_at_stage_deadline(manual_clock):
+    deadline = auto_join.JoinDeadline(target=manual_clock.now + 3, hard=manual_clock.now + 120)
+    policy = auto_join.RetryPolicy(name="test_stage", attempts=100, base_delay=1.0, max_delay=1.0, jitter=0.0)
+    started = manual_clock.now
+    with deadline.stage("window", 5):
+        assert policy.run(lambda: False) is False
+    assert manual_clock.now - started <= 5
@@ -0,0 +1,99 @@
+import datetime
+
+import pytest
+
+pytest.importorskip("win32com")
+
+import auto_join_teams_meeting as auto_join  # noqa: E402
+
+
+class FakeCom:
+    """COM object double: every attribute read, method call and collection fetch is one logged round trip"""
+
+    _oleobj_ = object()
+
+    def __init__(self, log, **attributes):
+        self.__dict__["_log"] = log
+        self.__dict__["_attributes"] = attributes
+
+    def __getattr__(self, name):
+        value = self._attributes[name]
+        if callable(value) and not isinstance(value, FakeCom):
+            def method(*args):
+                self._log.append(name)
+                return value(*args)
+
+            return method
+        self._log.append(name)
+        return value
+
+    def __setattr__(self, name, value):
+        self._log.append(name)
+        self._attributes[name] = value
+
+    def __iter__(self):
+        for item in self._attributes["items"]:
+            self._log.append("next")
+            yield item
+
+    def __str__(self):
+        self._log.append("str")
+        return str(self._attributes.get("value", ""))
+
+    def __int__(self):
+        self._log.append("int")
+        return int(self._attributes.get("value", 0))
+
+
+def _appointment(log, number):
+    start = datetime.datetime(2026, 10, 19, 9 + number)
+    accessor = FakeCom(log, GetProperties=lambda tags: [f"https://teams.microsoft.com/l/meetup-join/{number}"] + [
+        -2147221233] * (len(tags) - 1), GetProperty=lambda tag: -2147221233)
+    return FakeCom(log, Start=start, End=start + datetime.timedelta(minutes=30), Subject=f"Meeting {number}",
+                   Duration=30, Location="", GetOrganizer=lambda: FakeCom(log, value="Organizer"), IsRecurring=False,
+                   GetRecurrencePattern=lambda: FakeCom(log, value=0), Body="", EntryID=f"entry-{number}",
+                   PropertyAccessor=accessor)
+
+
+class FakeOutlook(auto_join.OutlookApi):
+    log = list()
+    items = 3
+
+    @classmethod
+    def _dispatch_outlook(cls):
+        items = FakeCom(cls.log, items=[_appointment(cls.log, number) for number in range(cls.items)],
+                        Sort=lambda key: None, IncludeRecurrences=False)
+        items._attributes["Restrict"] = lambda query: items
+        folder = FakeCom(cls.log, Items=items, Name="Calendar")
+        return FakeCom(cls.log, GetDefaultFolder=lambda number: folder, getDefaultFolder=lambda number: folder)
+
+
+@pytest.fixture()
+def outlook():
+    FakeOutlook.log.clear()
+    calendar = FakeOutlook(call_timeout=5)
+    yield calendar
+    calendar.broker.shutdown()
+
+
+def test_com_calls_per_item_are_measured(outlook):
+    FakeOutlook.log.clear()
+    before = outlook.com_stats.com_calls
+    events = outlook.read_events()
+
+    assert [event.Subject for event in events] == ["Meeting 0", "Meeting 1", "Meeting 2"]
+    # Every round trip of the fake is counted by broker, item counts add up to all reads but the calendar lookup
+    assert outlook.com_stats.com_calls - before == len(FakeOutlook.log)
+    assert sum(event.ComCalls for event in events) == len(FakeOutlook.log) - FakeOutlook.log.index("next")
+    assert len({event.ComCalls for event in events}) == 1
+
+
+def test_batched_property_read_cost_does_not_grow_with_properties(outlook):
+    (few,) = {event.ComCalls for event in outlook.read_events()}
+    outlook.property_tags = dict(outlook.property_tags, **{f"Extra{number}": f"tag-{number}" for number in range(20)})
+    (many,) = {event.ComCalls for event in outlook.read_events()}
+
+    assert few == many
+    # One property read per tag would take a PropertyAccessor read and a GetProperty call per property
+    unbatched = few - 2 + 2 * len(outlook.property_tags)
+    assert many < unbatched
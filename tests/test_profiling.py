@@ -0,0 +1,28 @@
+import glob
+import os
+import pstats
+
+from profiling import StageProfiler
+
+
+class Backend:
+    def join(self):
+        return self.discovery() + 1
+
+    def discovery(self):
+        return sum(range(1000))
+
+
+def test_nested_stage_writes_own_dump(tmp_path):
+    profiler = StageProfiler(output_dir=str(tmp_path))
+    profiler.instrument(Backend, ["join"], "join")
+    profiler.instrument(Backend, ["discovery"], "discovery")
+    profiler.start()
+    assert Backend().join() == sum(range(1000)) + 1
+    profiler.stop()
+    discovery_dumps = glob.glob(os.path.join(str(tmp_path), "discovery-*.prof"))
+    join_dumps = glob.glob(os.path.join(str(tmp_path), "join-*.prof"))
+    assert len(discovery_dumps) == 1 and len(join_dumps) == 1
+    # Outer dump still covers the nested stage
+    functions = {function for _, _, function in pstats.Stats(join_dumps[0]).stats}
+    assert "discovery" in functions
@@ -0,0 +1,18 @@
+import pytest
+
+pytest.importorskip("win32com")
+
+import simulation  # noqa: E402
+
+
+def test_peak_applies_changes_of_one_instant_together():
+    assert simulation._peak([(0.0, 1), (0.0, 1), (0.0, -1), (1.0, -1), (2.0, 1)]) == 1
+    assert simulation._peak([]) == 0
+
+
+def test_queue_depth_counts_meetings_not_started_by_pool_thread():
+    report = simulation.Simulation(days=1, meetings_per_day=20, seed=1).run()
+    assert report["joined"] == report["scheduled"]
+    # Every meeting is submitted at once, pool threads take as many as there are chains in flight
+    assert 0 < report["max_queue_depth"] <= report["scheduled"] - 1
+    assert report["max_queue_depth"] >= report["scheduled"] - report["max_threads"]
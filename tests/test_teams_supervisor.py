@@ -0,0 +1,100 @@
+import pytest
+
+pytest.importorskip("win32com")
+
+import auto_join_teams_meeting as auto_join  # noqa: E402
+
+
+class History:
+    def __init__(self):
+        self.records = list()
+
+    def record(self, latency):
+        self.records.append(latency)
+
+    def lead_time(self, hour=None):
+        return None
+
+
+class ManualClock(auto_join.SystemClock):
+    """Clock which only moves when the test sleeps"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+        self.sleeps = list()
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        if len(self.sleeps) > 100:
+            raise RuntimeError("Supervisor is spinning")
+        self.now += max(0.0, seconds)
+
+
+class FakeSupervisor(auto_join.TeamsSupervisor):
+    """Teams client which becomes responsive on the third readiness check"""
+
+    def __init__(self, windows):
+        super().__init__(enum=None, history=History())
+        self.windows = windows
+        self.checks = 0
+        self.launched = 0
+
+    def teams_windows(self):
+        return list(self.windows)
+
+    def ready(self):
+        self.checks += 1
+        return self.checks > 2
+
+    def launch(self):
+        self.launched += 1
+        return True
+
+
+@pytest.fixture(autouse=True)
+def fast_policy(monkeypatch):
+    monkeypatch.setattr(FakeSupervisor, "ready_policy", auto_join.RetryPolicy(name="teams_start", attempts=5,
+                                                                              base_delay=0.0, max_delay=0.0))
+
+
+def test_launch_is_recorded_as_cold_start():
+    supervisor = FakeSupervisor(windows=[])
+    assert supervisor.ensure_ready(warm_up=auto_join.clock.time() + 60)
+    assert supervisor.launched == 1 and len(supervisor.history.records) == 1
+
+
+def test_hung_client_wait_is_not_a_cold_start():
+    supervisor = FakeSupervisor(windows=[1])
+    assert supervisor.ensure_ready(warm_up=auto_join.clock.time() + 60)
+    assert supervisor.launched == 0 and supervisor.history.records == []
+
+
+def test_cold_start_history_stores_only_cold_starts(tmp_path):
+    path = str(tmp_path / "teams_start.json")
+    history = auto_join.ColdStartHistory(path)
+    for latency in (20.0, 30.0, 40.0):
+        history.record(latency)
+    assert set(history.records[0]) == {"latency", "recorded"}
+    assert auto_join.ColdStartHistory(path).lead_time() == 40.0
+
+
+def test_supervisor_does_not_spin_at_warm_up_time():
+    manual = ManualClock()
+    previous = auto_join.install_clock(manual)
+    try:
+        supervisor = FakeSupervisor(windows=[1])
+        supervisor.checks = 10
+        supervisor.margin = 0.0
+        supervisor.cold_start = 0.0
+        # Warm-up exactly now: nothing moves the clock unless the supervisor sleeps
+        supervisor.warm_ups = [manual.now, manual.now + 0.2]
+        supervisor._run()
+    finally:
+        auto_join.install_clock(previous)
+    assert manual.sleeps and min(manual.sleeps) >= supervisor.min_interval
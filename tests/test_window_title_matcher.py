@@ -0,0 +1,21 @@
+import random
+
+import pytest
+
+pytest.importorskip("win32com")
+
+import auto_join_teams_meeting as auto_join  # noqa: E402
+
+
+def test_pure_python_automaton_matches_like_substring_search(monkeypatch):
+    monkeypatch.setattr(auto_join, "ahocorasick", None)
+    names = ["Sync | Microsoft Teams", "Team Sync | Microsoft Teams", "Standup | Microsoft Teams", "aab", "ab", "b"]
+    generator = random.Random(7)
+    names += ["".join(generator.choice("abc ") for _ in range(generator.randint(1, 6))) for _ in range(200)]
+    matcher = auto_join.WindowTitleMatcher(names)
+    assert isinstance(matcher.automaton, auto_join._TitleAutomaton)
+    titles = ["Team Sync | Microsoft Teams", "Chat | Microsoft Teams", "xaabx"]
+    titles += ["".join(generator.choice("abc ") for _ in range(40)) for _ in range(100)]
+    for title in titles:
+        assert matcher.names_in(title) == {name for name in matcher.names if name in title}
+    assert {"Sync | Microsoft Teams", "Team Sync | Microsoft Teams"} <= matcher.names_in("Team Sync | Microsoft Teams")